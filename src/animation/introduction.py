@@ -6,13 +6,11 @@ class Introduction(Animations):
     def __init__(self, player, screen):
         super().__init__(player, screen)
         self.player = player
-        self.introduction = not JM.get_specific_information('["player"]["animations_finished"]["introduction"]')
+        self.introduction = not JM.get(("player", "animations_finished", "introduction"))
 
 
     def change_animation_state(self):
-        animation_status = JM.open_file("saves")
-        animation_status["player"]["animations_finished"]["introduction"] = True
-        JM.write_file("saves", animation_status)
+        JM.set(("player", "animations_finished", "introduction"), True)
 
     def run(self):
         if not self.screen_animation_finished:
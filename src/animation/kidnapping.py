@@ -9,16 +9,14 @@ class KidnappingAnimation(Animations):
         self.player = player
         self.map_manager = map_manager
         self.thief = self.map_manager.voleur_world
-        self.animation_complete = JM.get_specific_information('["player"]["animations_finished"]["kidnapping"]')
+        self.animation_complete = JM.get(("player", "animations_finished", "kidnapping"))
 
     def run(self):
         self.create_screen_border(self.screen.get_width(), self.screen.get_height())
         self.move_thief(self.thief)
 
     def change_animation_state(self):
-        animation_status = JM.open_file("saves")
-        animation_status["player"]["animations_finished"]["kidnapping"] = True
-        JM.write_file("saves", animation_status)
+        JM.set(("player", "animations_finished", "kidnapping"), True)
 
     def move_thief(self, thief):
         if not thief.position[0] >= self.player.position[0]:
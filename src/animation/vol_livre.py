@@ -13,12 +13,10 @@ class VolLivreAnimation(Animations):
         self.border_count = 0
         self.border_complete = False
         self.book_stolen = False
-        self.animation_complete = JM.get_specific_information('["player"]["animations_finished"]["thief"]')
+        self.animation_complete = JM.get(("player", "animations_finished", "thief"))
 
     def change_animation_state(self):
-        animation_status = JM.open_file("saves")
-        animation_status["player"]["animations_finished"]["thief"] = True
-        JM.write_file("saves", animation_status)
+        JM.set(("player", "animations_finished", "thief"), True)
 
     
 
@@ -0,0 +1,88 @@
+"""Compare, sur la grille de World_Alpha, une recherche A* par entité avec un champ de flux partagé
+(FlowField) pour des entités qui suivent le même but. Le but avance d'une case à chaque frame :
+le champ est recalculé une fois (autour du but) puis chaque entité lit sa case.
+Le coût affiché est le coût d'une frame divisé par le nombre d'entités.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_flow_field
+"""
+import os
+import random
+import time
+
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from maps.flow_field import FlowField, FlowFields
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+
+
+# le but suit le trajet d'un PNJ de World_Alpha
+GOAL_ROUTE = [[132, 22], [186, 123]]
+FRAMES = 5
+
+
+def get_reachable_cells(path_finder : PathFinder, goal, radius) -> list:
+    field = FlowField(path_finder, radius)
+    field.set_goal(goal)
+    return [[row, column] for row in range(path_finder.height) for column in range(path_finder.width)
+            if field.get_distance(row, column) is not None]
+
+
+def a_star_frame(path_finder : PathFinder, agents : list, goal) -> None:
+    for agent in agents:
+        path_finder.find_path(agent, goal)
+
+
+def flow_field_frame(flow_fields : FlowFields, target, agents : list, goal, radius) -> None:
+    if radius is None:
+        field = flow_fields.get_field(goal)
+    else:
+        field = flow_fields.follow(target, *FlowFields.get_cell_center(goal), radius)
+    for agent in agents:
+        flow_fields.get_target(field, *FlowFields.get_cell_center(agent))
+
+
+def check(path_finder : PathFinder, agents : list, goal, radius) -> None:
+    """Les distances du champ sont celles des chemins les plus courts"""
+    field = FlowField(path_finder, radius)
+    field.set_goal(goal)
+    for agent in agents[:20]:
+        assert field.get_distance(*agent) == len(path_finder.find_path(agent, goal)) - 1, agent
+
+
+def compare(name : str, path_finder : PathFinder, trajectory : list, radius, rng : random.Random) -> None:
+    cells = get_reachable_cells(path_finder, trajectory[0], radius // 2 if radius else None)
+    for number in (10, 100, 1000):
+        agents = [rng.choice(cells) for _ in range(number)]
+        check(path_finder, agents, trajectory[0], radius)
+        flow_fields = FlowFields(path_finder)
+        target = object()
+
+        start = time.perf_counter()
+        for goal in trajectory:
+            a_star_frame(path_finder, agents, goal)
+        a_star_time = (time.perf_counter() - start) / len(trajectory)
+
+        start = time.perf_counter()
+        for goal in trajectory:
+            flow_field_frame(flow_fields, target, agents, goal, radius)
+        flow_time = (time.perf_counter() - start) / len(trajectory)
+
+        print(f"{name:<16} | {number:>8} | {a_star_time * 1e6 / number:>18.1f} | {flow_time * 1e6 / number:>20.1f}")
+
+
+def main():
+    rng = random.Random(0)
+    grid = MapCache.get_artifacts("World_Alpha").collision_grid
+    path_finder = PathFinder(grid)
+    route = path_finder.find_path(*GOAL_ROUTE)
+    print(f"{'but':<16} | {'entités':>8} | {'A* (µs / entité)':>18} | {'champ (µs / entité)':>20}")
+    # le joueur suivi par des ennemis proches : champ limité à FOLLOW_RADIUS cases
+    compare(f"mobile, {FlowFields.FOLLOW_RADIUS} cases", path_finder, route[:FRAMES], FlowFields.FOLLOW_RADIUS, rng)
+    # un point de quête pour toutes les entités de la map : champ complet
+    compare("fixe, toute map", path_finder, route[-1:], None, rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compare la recherche complète (PathFinder) avec la recherche hiérarchique (HierarchicalPathFinder)
+sur des trajets aléatoires de World_Alpha et d'un monde 2x plus grand de chaque côté (World_Alpha
+répété 2x2). Affiche le temps de construction du graphe, le temps d'une recherche (chemin abstrait
+seul, puis chemin détaillé), le rapport des longueurs avec le plus court chemin et le nombre de
+recherches complètes faites par find_path pour tenir MAX_RATIO. Les lignes "départ bloqué" partent
+d'une case bloquée à côté d'une case libre (accepté par PathFinder, le joueur sur une route par exemple).
+
+Lancer depuis le dossier src : python -m benchmarks.bench_hierarchical
+"""
+import os
+import random
+import time
+
+import numpy as np
+
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from maps.hierarchical import HierarchicalPathFinder
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+
+
+ROUTES = 100
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    try:
+        result = function(*args)
+    except ValueError:
+        result = None
+    return result, time.perf_counter() - start
+
+
+def get_blocked_starts(grid : np.ndarray) -> list:
+    """Cases bloquées qui ont au moins une voisine libre"""
+    free = np.pad(grid == 0, 1)
+    free_neighbour = free[:-2, 1:-1] | free[2:, 1:-1] | free[1:-1, :-2] | free[1:-1, 2:]
+    return np.argwhere((grid != 0) & free_neighbour).tolist()
+
+
+def compare(name : str, grid : np.ndarray, rng : random.Random, blocked_start : bool = False) -> None:
+    path_finder = PathFinder(grid)
+    hierarchical_path_finder, build_time = timed(HierarchicalPathFinder, path_finder)
+    free = np.argwhere(grid == 0).tolist()
+    starts = get_blocked_starts(grid) if blocked_start else free
+    times = [0, 0, 0]
+    ratios = []
+    fallbacks = 0
+    for _ in range(ROUTES):
+        init, goal = rng.choice(starts), rng.choice(free)
+        expected, flat_time = timed(path_finder.find_path, init, goal)
+        abstract, abstract_time = timed(hierarchical_path_finder.find_abstract_path, init, goal)
+        path, path_time = timed(hierarchical_path_finder.find_path, init, goal)
+        for index, result in enumerate((flat_time, abstract_time, path_time)):
+            times[index] += result
+        assert (expected is None) == (path is None), (init, goal)
+        if expected is not None:
+            ratios.append((len(path) - 1) / max(len(expected) - 1, 1))
+            fallbacks += abstract[1] > HierarchicalPathFinder.MAX_RATIO * (abs(init[0] - goal[0]) + abs(init[1] - goal[1]))
+
+    times = [result * 1e3 / ROUTES for result in times]
+    print(f"{name:<18} | {build_time * 1e3:>11.0f} | {times[0]:>9.2f} | {times[1]:>13.2f} | {times[2]:>14.2f} | "
+          f"{np.mean(ratios):>7.3f} | {max(ratios):>7.3f} | {fallbacks:>3} / {len(ratios):<3}")
+
+
+def main():
+    rng = random.Random(0)
+    grid = MapCache.get_artifacts("World_Alpha").collision_grid
+    print(f"{'grille':<18} | {'graphe (ms)':>11} | {'A* (ms)':>9} | {'abstrait (ms)':>13} | {'détaillé (ms)':>14} | "
+          f"{'moyenne':>7} | {'pire':>7} | {'A* complet':>9}")
+    compare("World_Alpha", grid, rng)
+    compare("départ bloqué", grid, rng, True)
+    compare("World_Alpha 2x2", np.tile(grid, (2, 2)), rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Compare l'ancienne recherche de chemin de MapManager (liste triée à chaque tour, grilles
+recréées à chaque appel) avec PathFinder (tas binaire, tableaux plats réutilisés) sur la grille
+de World_Alpha et sur des grilles aléatoires de la même taille. Les chemins doivent être identiques.
+Le temps de construction de la grille d'heuristique (faite avant chaque recherche par l'ancien code)
+est mesuré à part, PathFinder peut aussi calculer l'heuristique pendant la recherche.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_pathfinding
+"""
+import os
+import random
+import time
+
+import numpy as np
+
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+
+
+# trajets des PNJ de World_Alpha (MapManager.points_list)
+WORLD_ALPHA_ROUTES = [[[132, 22], [186, 123]], [[90, 144], [225, 88]], [[233, 168], [118, 30]],
+                      [[188, 132], [234, 13]], [[164, 229], [92, 19]], [[195, 95], [133, 237]],
+                      [[131, 22], [106, 113]], [[183, 148], [118, 98]], [[129, 144], [223, 153]]]
+RANDOM_ROUTES = 9
+
+
+def heuristic(grid, goal):
+    heuristic = [[0 for row in range(len(grid[0]))] for col in range(len(grid))]
+    for i in range(len(grid)):
+        for j in range(len(grid[0])):
+            heuristic[i][j] = abs(i - goal[0]) + abs(j - goal[1])
+            if grid[i][j] == 1:
+                # added extra penalty in the heuristic map
+                heuristic[i][j] = 99
+    return heuristic
+
+
+# ancienne version de MapManager.check_shortest_path
+def check_shortest_path(grid, init, goal, cost, heuristic):
+    """Retourne le chemin le plus court dans une grille 2d d'un point
+    init à un point goal
+
+    Args:
+        grid (list): grille
+        init (tuple): position de départ
+        goal (tuple): position d'arrivée
+        cost (int): fonction de coût
+        heuristic (list[list[int]]): liste d'estimation
+
+    Returns:
+        tuple[list[list[int]], list[list[int]]]: chemin le plus court
+    """
+
+    DIRECTIONS = [
+        [-1, 0],  # left
+        [0, -1],  # down
+        [1, 0],  # right
+        [0, 1],  # up
+    ]
+
+    closed = [
+        [0 for col in range(len(grid[0]))] for row in range(len(grid))
+    ]  # the reference grid
+    closed[init[0]][init[1]] = 1
+    action = [
+        [0 for col in range(len(grid[0]))] for row in range(len(grid))
+    ]  # the action grid
+
+    x = init[0]
+    y = init[1]
+    g = 0
+    f = g + heuristic[x][y]  # cost from starting cell to destination cell
+    cell = [[f, g, x, y]]
+
+    found = False  # flag that is set when search is complete
+    resign = False  # flag set if we can't find expand
+
+    while not found and not resign:
+        if len(cell) == 0:
+            raise ValueError("Algorithm is unable to find solution")
+        else:  # to choose the least costliest action so as to move closer to the goal
+            cell.sort()
+            cell.reverse()
+            next = cell.pop()
+            x = next[2]
+            y = next[3]
+            g = next[1]
+
+            if x == goal[0] and y == goal[1]:
+                found = True
+            else:
+                for i in range(len(DIRECTIONS)):  # to try out different valid actions
+                    x2 = x + DIRECTIONS[i][0]
+                    y2 = y + DIRECTIONS[i][1]
+                    if x2 >= 0 and x2 < len(grid) and y2 >= 0 and y2 < len(grid[0]):
+                        if closed[x2][y2] == 0 and grid[x2][y2] == 0:
+                            g2 = g + cost
+                            f2 = g2 + heuristic[x2][y2]
+                            cell.append([f2, g2, x2, y2])
+                            closed[x2][y2] = 1
+                            action[x2][y2] = i
+    invpath = []
+    x = goal[0]
+    y = goal[1]
+    invpath.append([x, y])  # we get the reverse path from here
+    while x != init[0] or y != init[1]:
+        x2 = x - DIRECTIONS[action[x][y]][0]
+        y2 = y - DIRECTIONS[action[x][y]][1]
+        x = x2
+        y = y2
+        invpath.append([x, y])
+
+    path = []
+    for i in range(len(invpath)):
+        path.append(invpath[len(invpath) - 1 - i])
+    return path, action
+
+
+def create_random_routes(grid : list, rng : random.Random) -> list:
+    free = [[row, column] for row in range(len(grid)) for column in range(len(grid[0])) if not grid[row][column]]
+    return [rng.sample(free, 2) for _ in range(RANDOM_ROUTES)]
+
+
+def find_paths(find_path, routes : list, heuristics : list) -> list:
+    paths = []
+    for (init, goal), estimate in zip(routes, heuristics):
+        try:
+            paths.append(find_path(init, goal, 1, estimate))
+        except ValueError:
+            paths.append(None)
+    return paths
+
+
+def compare(name : str, grid : list, routes : list) -> None:
+    start = time.perf_counter()
+    heuristics = [heuristic(grid, goal) for _, goal in routes]
+    heuristic_time = time.perf_counter() - start
+    path_finder = PathFinder(grid)
+
+    start = time.perf_counter()
+    old_paths = []
+    for (init, goal), estimate in zip(routes, heuristics):
+        try:
+            old_paths.append(check_shortest_path(grid, init, goal, 1, estimate)[0])
+        except ValueError:
+            old_paths.append(None)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_paths = find_paths(path_finder.find_path, routes, heuristics)
+    new_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lazy_paths = find_paths(path_finder.find_path, routes, [None] * len(routes))
+    lazy_time = time.perf_counter() - start
+
+    assert old_paths == new_paths == lazy_paths, name
+    results = [heuristic_time, old_time, new_time, lazy_time]
+    print(f"{name:<22} | {len(routes):>7} | " + " | ".join(f"{result * 1e3 / len(routes):>16.2f}" for result in results))
+
+
+def main():
+    rng = random.Random(0)
+    columns = ["heuristique (ms)", "ancienne (ms)", "PathFinder (ms)", "à la volée (ms)"]
+    print(f"{'grille':<22} | {'trajets':>7} | " + " | ".join(f"{column:>16}" for column in columns))
+    grid = MapCache.get_artifacts("World_Alpha").collision_grid.tolist()
+    compare("World_Alpha", grid, WORLD_ALPHA_ROUTES)
+    compare("World_Alpha aléatoire", grid, create_random_routes(grid, rng))
+    for density in (0.1, 0.25):
+        grid = (np.random.default_rng(0).random((250, 250)) < density).astype(np.uint8).tolist()
+        compare(f"250x250 murs {int(density * 100)} %", grid, create_random_routes(grid, rng))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Test de charge du backend SQLite : des milliers de joueurs simulés passent par
+PlayerInformation.update_user_informations, sans réseau.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_player_backend
+"""
+import os
+import random
+import tempfile
+import time
+
+from database_management.remote_backends import SQLiteBackend
+from entities.player import PlayerInformation
+
+
+PLAYERS = 5000
+UPDATES_PER_PLAYER = 4
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        # la file d'envoi écrit dans data/ du dossier courant
+        os.chdir(directory)
+        os.mkdir("data")
+        backend = SQLiteBackend(os.path.join(directory, "players.db"))
+        player_informations = PlayerInformation(backend=backend)
+
+        start = time.perf_counter()
+        for update in range(UPDATES_PER_PLAYER):
+            for player in range(PLAYERS):
+                player_informations.update_user_informations(f"joueur_{player}", update, random.randint(0, 1000), update, player % 100)
+        enqueued = time.perf_counter()
+        player_informations.sync_queue.flush()
+        synced = time.perf_counter()
+
+        total = PLAYERS * UPDATES_PER_PLAYER
+        print(f"{total} mises à jour pour {PLAYERS} joueurs")
+        print(f"ajout dans la file : {(enqueued - start) * 1000:.0f} ms ({(enqueued - start) / total * 1e6:.1f} µs par appel)")
+        print(f"fin de l'envoi     : {(synced - start) * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        for player in range(PLAYERS):
+            assert backend.get_user(f"joueur_{player}")["dungeons"] == UPDATES_PER_PLAYER - 1
+        print(f"lecture par pseudo : {(time.perf_counter() - start) / PLAYERS * 1e6:.1f} µs par joueur")
+
+        start = time.perf_counter()
+        backend.update_users({f"joueur_{player}": {"dungeons": 9, "money": 0, "level": [9, 9]} for player in range(PLAYERS)})
+        print(f"upsert en un lot   : {(time.perf_counter() - start) * 1000:.0f} ms pour {PLAYERS} joueurs")
+        print(f"classement         : {backend.get_leaderboard(3)}")
+        player_informations.sync_queue.close()
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
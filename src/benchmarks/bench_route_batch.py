@@ -0,0 +1,52 @@
+"""Compare le calcul de trajets un par un dans le processus du jeu avec RouteBatch (pool de processus,
+grille en mémoire partagée) sur la grille de World_Alpha. Les chemins doivent être identiques.
+Le gain dépend du nombre de coeurs de la machine (affiché), le démarrage du pool est compté.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_route_batch
+"""
+import os
+import random
+import time
+
+import numpy as np
+
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+from maps.route_batch import RouteBatch
+
+
+def find_paths(path_finder : PathFinder, routes : list) -> list:
+    paths = []
+    for start, goal in routes:
+        try:
+            paths.append(path_finder.find_path(start, goal, 1))
+        except ValueError:
+            paths.append(None)
+    return paths
+
+
+def main():
+    rng = random.Random(0)
+    grid = MapCache.get_artifacts("World_Alpha").collision_grid
+    free = np.argwhere(grid == 0).tolist()
+    workers = sorted({1, 2, os.cpu_count() or 1})
+    print(f"coeurs : {os.cpu_count()}")
+    print(f"{'trajets':>8} | {'un par un (ms)':>15} | " + " | ".join(f"{f'{number} processus (ms)':>18}" for number in workers))
+    for number in (9, 100, 400):
+        routes = [rng.sample(free, 2) for _ in range(number)]
+        start = time.perf_counter()
+        expected = find_paths(PathFinder(grid), routes)
+        results = [time.perf_counter() - start]
+        for max_workers in workers:
+            start = time.perf_counter()
+            paths = RouteBatch.find_paths({"World_Alpha": grid}, {"World_Alpha": routes}, max_workers)["World_Alpha"]
+            results.append(time.perf_counter() - start)
+            assert paths == expected, max_workers
+        print(f"{number:>8} | {results[0] * 1e3:>15.1f} | " + " | ".join(f"{result * 1e3:>18.1f}" for result in results[1:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Compare le format json d'origine et le format binaire des sauvegardes.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_save_formats
+"""
+import timeit
+
+from database_management.save_codec import JsonCodec, BinaryCodec
+
+
+REPEAT = 20
+
+
+def create_save(quests_number : int, positions_number : int) -> dict:
+    """Même structure que NewPlayer.create_new_player_informations, avec beaucoup de quêtes et de positions"""
+    quests = {
+        f"Quête numéro {i}": {f"Quête numéro {i}": f"Quête numéro {i}", "position": [i * 16, i * 32], "xp": 10}
+        for i in range(quests_number)
+    }
+    positions = {f"world_{i}": [i * 16, i * 16] for i in range(positions_number)}
+    positions.update({"World_Alpha": [1500, 1500], "library": [0, 0]})
+    return {
+        "player": {
+            "new_game": False,
+            "keys_text_displayed": True,
+            "life": 100,
+            "current_world": "World_Alpha",
+            "position": positions,
+            "animations_finished": {"introduction": True, "thief": False, "kidnapping": False},
+            "database_data": {"dungeons": 0, "nickname": "bench", "money": 0, "level": [0, 0], "quests": quests},
+        }
+    }
+
+
+def main():
+    print(f"{'quêtes':>7} | {'format':>7} | {'taille (o)':>10} | {'dump (ms)':>9} | {'load (ms)':>9}")
+    for size in (100, 500, 1000):
+        data = create_save(size, size)
+        for codec in (JsonCodec, BinaryCodec):
+            content = codec.dumps(data)
+            assert codec.loads(content) == JsonCodec.loads(JsonCodec.dumps(data))
+            dump = timeit.timeit(lambda: codec.dumps(data), number=REPEAT) / REPEAT
+            load = timeit.timeit(lambda: codec.loads(content), number=REPEAT) / REPEAT
+            print(f"{size:>7} | {codec.name:>7} | {len(content):>10} | {dump * 1000:>9.2f} | {load * 1000:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
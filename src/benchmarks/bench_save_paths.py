@@ -0,0 +1,43 @@
+"""Compare l'ancienne lecture par eval avec les chemins compilés de save_path.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_save_paths
+"""
+import timeit
+
+from database_management.save_path import get_value
+
+
+PATH = '["player"]["animations_finished"]["thief"]'
+REPEAT = 200
+
+
+def create_save(quests_number : int) -> dict:
+    quests = {f"quest {i}": {"position": [i, i], "xp": 10} for i in range(quests_number)}
+    return {
+        "player": {
+            "life": 100,
+            "position": {"World_Alpha": [1500, 1500], "library": [0, 0]},
+            "animations_finished": {"introduction": True, "thief": False, "kidnapping": False},
+            "database_data": {"nickname": "bench", "quests": quests},
+        }
+    }
+
+
+def eval_lookup(data, path):
+    return eval(f"{data}{path}")
+
+
+def main():
+    print(f"{'quêtes':>8} | {'eval (µs)':>12} | {'chaîne (µs)':>12} | {'tuple (µs)':>12}")
+    for quests_number in (10, 100, 1000, 10000):
+        data = create_save(quests_number)
+        results = [
+            timeit.timeit(lambda: eval_lookup(data, PATH), number=REPEAT),
+            timeit.timeit(lambda: get_value(data, PATH), number=REPEAT),
+            timeit.timeit(lambda: get_value(data, ("player", "animations_finished", "thief")), number=REPEAT),
+        ]
+        print(f"{quests_number:>8} | " + " | ".join(f"{result / REPEAT * 1e6:>12.2f}" for result in results))
+
+
+if __name__ == '__main__':
+    main()
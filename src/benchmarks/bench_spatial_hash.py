@@ -0,0 +1,65 @@
+"""Compare la recherche des entités dans la vision de chaque ennemi en parcourant toutes les entités
+avec la recherche dans les cases de SpatialHash, pour une frame où toutes les entités bougent.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_spatial_hash
+"""
+import random
+import timeit
+
+import pygame as py
+
+from maps.spatial_hash import SpatialHash
+
+
+MAP_SIZE = 250 * 16
+VISION_SIZE = 300
+REPEAT = 5
+
+
+class BenchEntity:
+    def __init__(self, rng : random.Random):
+        self.rect = py.Rect(rng.randrange(MAP_SIZE), rng.randrange(MAP_SIZE), 16, 32)
+
+
+def move(entities : list, rng : random.Random) -> None:
+    for entity in entities:
+        entity.rect.move_ip(rng.randint(-2, 2), rng.randint(-2, 2))
+
+
+def brute_force_frame(entities : list, enemies : list, rng : random.Random) -> None:
+    move(entities, rng)
+    for enemy in enemies:
+        vision = py.Rect(0, 0, VISION_SIZE, VISION_SIZE)
+        vision.center = enemy.rect.center
+        [entity for entity in entities if vision.colliderect(entity.rect)]
+
+
+def spatial_hash_frame(entities : list, enemies : list, spatial_hash : SpatialHash, rng : random.Random) -> None:
+    move(entities, rng)
+    for entity in entities:
+        spatial_hash.update(entity)
+    for enemy in enemies:
+        vision = py.Rect(0, 0, VISION_SIZE, VISION_SIZE)
+        vision.center = enemy.rect.center
+        spatial_hash.query(vision)
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'entités':>8} | {'ennemis':>8} | {'toutes (ms)':>12} | {'SpatialHash (ms)':>17}")
+    for number in (100, 500, 2000):
+        entities = [BenchEntity(rng) for _ in range(number)]
+        enemies = entities[:number // 10]
+        spatial_hash = SpatialHash()
+        for entity in entities:
+            spatial_hash.insert(entity)
+
+        results = [
+            timeit.timeit(lambda: brute_force_frame(entities, enemies, rng), number=REPEAT),
+            timeit.timeit(lambda: spatial_hash_frame(entities, enemies, spatial_hash, rng), number=REPEAT),
+        ]
+        print(f"{number:>8} | {len(enemies):>8} | {results[0] / REPEAT * 1e3:>12.2f} | {results[1] / REPEAT * 1e3:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Rapport du temps de démarrage jusqu'à la première image du menu.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_startup
+(la fenêtre n'est pas affichée, SDL utilise le pilote vidéo "dummy")
+"""
+import os
+import time
+
+START = time.perf_counter()
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+
+def report(step : str, game=None) -> None:
+    firebase_ready = game is not None and game.player_informations._ref is not None
+    print(f"{step:<28} {(time.perf_counter() - START) * 1000:>9.1f} ms   firebase initialisé : {firebase_ready}")
+
+
+def main():
+    import pygame as py
+    import pygame_widgets
+    py.init()
+    py.font.init()
+    report("pygame initialisé")
+
+    from game import Game
+    report("modules du jeu importés")
+
+    game = Game(1200, 600)
+    report("Game.__init__", game)
+
+    # même chose que le premier tour de Game.run
+    if game.is_new_game():
+        game.new_player_menu.create()
+        pygame_widgets.update(py.event.get())
+    else:
+        game.ouvrir_menu()
+    py.display.flip()
+    report("première image du menu", game)
+
+    game.player_informations.connect()
+    report("firebase prêt (arrière-plan)", game)
+    py.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Mémoire occupée par les surfaces des tuiles quand toutes les maps de Maps/ sont chargées,
+avec pytmx seul (chaque map découpe ses tilesets) puis avec le registre de tilesets partagés.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_tileset_memory
+(les maps dont une image de tileset est introuvable sont ignorées)
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# le jeu charge ses fichiers depuis la racine du dépôt
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import pygame as py
+import pytmx
+from pytmx.util_pygame import load_pygame
+
+from maps.map_cache import MapCache
+from maps.tileset_registry import TilesetRegistry
+
+
+def load_all(load) -> dict:
+    maps = {}
+    for name in MapCache.get_map_names():
+        try:
+            maps[name] = load(MapCache.tmx_path(name))
+        except (FileNotFoundError, py.error) as error:
+            print(f"  {name} ignorée : {error}")
+    return maps
+
+
+def get_resident_bytes(maps : dict) -> int:
+    surfaces = {id(image) : image for tmx_data in maps.values() for image in tmx_data.images if image is not None}
+    return sum(TilesetRegistry.get_surface_size(surface) for surface in surfaces.values())
+
+
+def main():
+    py.init()
+    py.display.set_mode((1, 1))
+
+    print("pytmx.util_pygame.load_pygame")
+    before = load_all(load_pygame)
+    before_bytes = get_resident_bytes(before)
+    del before
+
+    print("TilesetRegistry")
+    after = load_all(lambda path : pytmx.TiledMap(path, image_loader=TilesetRegistry.image_loader))
+    after_bytes = get_resident_bytes(after)
+    # surfaces gardées par le registre seul (images de tilesets pas encore libérées, tuiles d'une map ignorée)
+    registry_bytes = TilesetRegistry.get_size_in_bytes() - after_bytes
+
+    print(f"{len(after)} maps chargées")
+    print(f"avant : {before_bytes / 1e6:>8.2f} Mo de surfaces")
+    print(f"après : {after_bytes / 1e6:>8.2f} Mo de surfaces + {registry_bytes / 1e6:.2f} Mo gardés par le registre seul")
+    py.quit()
+
+
+if __name__ == '__main__':
+    main()
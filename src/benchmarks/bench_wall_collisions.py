@@ -0,0 +1,42 @@
+"""Compare le test des pieds contre tous les murs (collidelist) avec la grille des murs (WallGrid),
+pour une frame de 50 entités sur des maps de plus en plus grandes.
+
+Lancer depuis le dossier src : python -m benchmarks.bench_wall_collisions
+"""
+import random
+import timeit
+
+import pygame as py
+
+from maps.wall_grid import WallGrid
+
+
+TILE_SIZE = 16
+ENTITIES = 50
+REPEAT = 20
+
+
+def create_walls(size : int, rng : random.Random) -> list:
+    """Un mur sur environ une tuile sur six, comme World_Alpha"""
+    return [(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE) for y in range(size) for x in range(size) if rng.random() < 0.16]
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'tuiles':>9} | {'murs':>7} | {'collidelist (µs)':>17} | {'WallGrid (µs)':>14}")
+    for size in (50, 100, 250, 500):
+        walls = create_walls(size, rng)
+        rects = [py.Rect(wall) for wall in walls]
+        wall_grid = WallGrid(walls, size, size, TILE_SIZE, TILE_SIZE)
+        feet = [py.Rect(rng.randrange(size * TILE_SIZE), rng.randrange(size * TILE_SIZE), 16, 12) for _ in range(ENTITIES)]
+        assert [foot.collidelist(rects) > -1 for foot in feet] == [wall_grid.collides(foot) for foot in feet]
+
+        results = [
+            timeit.timeit(lambda: [foot.collidelist(rects) > -1 for foot in feet], number=REPEAT),
+            timeit.timeit(lambda: [wall_grid.collides(foot) for foot in feet], number=REPEAT),
+        ]
+        print(f"{size}x{size:<5} | {len(walls):>7} | " + " | ".join(f"{result / REPEAT * 1e6:>{width}.1f}" for result, width in zip(results, (17, 14))))
+
+
+if __name__ == '__main__':
+    main()
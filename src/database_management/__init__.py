@@ -1,2 +1,7 @@
 from .database_link import DatabaseLink
-from .json_management import JsonManagement
\ No newline at end of file
+from .json_management import JsonManagement
+from .save_store import SaveStore
+from .save_writer import SaveWriter
+from .sync_queue import SyncQueue
+from .remote_backends import RemoteBackend, FirebaseBackend, FileBackend, MemoryBackend, SQLiteBackend, create_backend
+from .connectivity import ConnectivityMonitor
@@ -0,0 +1,10 @@
+import sys
+
+from .save_codec import convert
+
+
+# conversion d'une sauvegarde : python -m database_management data/saves.json data/saves.sav
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("Usage : python -m database_management <source> <destination>")
+    convert(sys.argv[1], sys.argv[2])
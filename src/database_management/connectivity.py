@@ -0,0 +1,79 @@
+import threading
+import time
+
+import requests
+
+
+class ConnectivityMonitor:
+    """Regarde en arrière-plan si l'ordinateur est connecté à internet.
+
+    Le résultat est gardé pendant ttl secondes, is_online répond tout de suite avec la
+    dernière valeur connue et relance une vérification dans un thread quand elle est périmée.
+    L'url peut pointer vers un serveur local pour tester le jeu hors ligne.
+    """
+    DEFAULT_URL = "http://www.google.com"
+
+    def __init__(self, url : str = DEFAULT_URL, ttl : float = 30.0, timeout : float = 5.0):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.online = False
+        self.checked_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+        self.probe_finished = threading.Event()
+
+    def is_online(self) -> bool:
+        """Retourne l'état de la connexion sans attendre (False tant qu'aucune vérification n'a abouti)
+
+        Returns:
+            bool: True si la dernière vérification a réussi
+        """
+        if self.is_stale():
+            self.refresh()
+        return self.online
+
+    def is_stale(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.ttl
+
+    def refresh(self) -> None:
+        """Lance une vérification dans un thread s'il n'y en a pas déjà une"""
+        with self.lock:
+            if self.probing:
+                return
+            self.probing = True
+            self.probe_finished.clear()
+        threading.Thread(target=self._probe, name="connectivity-probe", daemon=True).start()
+
+    def wait(self, timeout : float = None) -> bool:
+        """Attend la fin de la vérification en cours
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Returns:
+            bool: l'état de la connexion
+        """
+        if self.probing:
+            self.probe_finished.wait(timeout)
+        return self.online
+
+    def probe(self) -> bool:
+        """Fais une requête internet (bloquant)
+
+        Returns:
+            bool: True si le serveur a répondu
+        """
+        try:
+            requests.get(self.url, timeout=self.timeout)
+            return True
+        except requests.RequestException:
+            return False
+
+    def _probe(self) -> None:
+        online = self.probe()
+        with self.lock:
+            self.online = online
+            self.checked_at = time.monotonic()
+            self.probing = False
+        self.probe_finished.set()
@@ -1,13 +1,50 @@
-import firebase_admin
-from firebase_admin import credentials, db
+import threading
+
+
+DATABASE_URL = 'https://mysteryland-fb22d-default-rtdb.europe-west1.firebasedatabase.app/'
 
 
 class DatabaseLink:
-    def __init__(self):
-        self.cred = credentials.Certificate("data/serviceAccountKey.json")
-        self.initialize_app()
-        self.ref = db.reference('database/')
-        self.users_ref = self.create_child('users')
+    def __init__(self, database_url : str = DATABASE_URL, credentials_path : str = "data/serviceAccountKey.json"):
+        self.database_url = database_url
+        self.credentials_path = credentials_path
+        # firebase_admin n'est importé et initialisé qu'à la première opération distante
+        # (ou en arrière-plan avec warm_up) pour ne pas ralentir l'ouverture du menu
+        self.cred = None
+        self._ref = None
+        self._users_ref = None
+        self._connect_lock = threading.Lock()
+
+    @property
+    def ref(self):
+        self.connect()
+        return self._ref
+
+    @property
+    def users_ref(self):
+        self.connect()
+        return self._users_ref
+
+    def connect(self) -> None:
+        """importe firebase_admin et initialise l'app si ce n'est pas déjà fait"""
+        with self._connect_lock:
+            if self._ref is not None:
+                return
+            from firebase_admin import credentials, db
+            self.cred = credentials.Certificate(self.credentials_path)
+            self.initialize_app()
+            self._ref = db.reference('database/')
+            self._users_ref = self._ref.child('users')
+
+    def warm_up(self) -> threading.Thread:
+        """initialise la base de donnée dans un thread à part (pendant le menu par exemple)
+
+        Returns:
+            threading.Thread: le thread d'initialisation
+        """
+        thread = threading.Thread(target=self.connect, name="database-warm-up", daemon=True)
+        thread.start()
+        return thread
         
     def initialize_app(self):
         """initialise l'app de la base de donnée 
@@ -15,7 +52,12 @@ class DatabaseLink:
         Returns:
             _type_: base de donnée
         """
-        return firebase_admin.initialize_app(self.cred, {'databaseURL' : 'https://mysteryland-fb22d-default-rtdb.europe-west1.firebasedatabase.app/'})
+        import firebase_admin
+        try:
+            # l'app a pu être initialisée par une tentative précédente
+            return firebase_admin.get_app()
+        except ValueError:
+            return firebase_admin.initialize_app(self.cred, {'databaseURL' : self.database_url})
     
     def create_child(self, child_name : str):
         """créer un child
@@ -28,4 +70,3 @@ class DatabaseLink:
         """
         return self.ref.child(child_name)
     
-    
\ No newline at end of file
@@ -1,10 +1,10 @@
 import pygame as py
-import json
+from .save_store import SaveStore
 
 
 class JsonManagement:
     def open_file(filename : str) -> dict:
-        """ouvre le fichier
+        """ouvre le fichier (les données sont gardées en mémoire après la première lecture)
 
         Args:
             filename (str): nom du fichier
@@ -12,29 +12,96 @@ class JsonManagement:
         Returns:
             dict: dictionnaire du fichier json
         """
-        with open(f'data/{filename}.json', 'r') as f:
-            data = json.load(f)
-        return data
+        return SaveStore.get_store(filename).data
     
     def write_file(filename : str, data : str) -> None:
-        """écrit le fichier
+        """écrit le fichier, l'écriture sur le disque se fait au prochain flush
 
         Args:
             filename (str): nom du fichier
             data (str): données
         """
-        with open(f'data/{filename}.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent = 4, ensure_ascii=False)
+        SaveStore.get_store(filename).replace(data)
             
     def get_specific_information(path : str) -> dict:
-        """obtient des infos précises du fichier
+        """obtient des infos précises du fichier (ancienne syntaxe, préférer JsonManagement.get)
 
         Args:
-            path (str): chemin d'acces
+            path (str): chemin d'acces, par exemple '["player"]["life"]'
 
         Returns:
             dict: dictionnaire du fichier json
         """
-        data = JsonManagement.open_file('saves')
-        return eval(f"{data}{path}")
-        
\ No newline at end of file
+        return JsonManagement.get(path)
+
+    def get(path, filename : str = 'saves'):
+        """obtient la valeur au bout d'un chemin
+
+        Args:
+            path (tuple | str): chemin d'acces, par exemple ("player", "life") ou '["player"]["life"]'
+            filename (str, optional): nom du fichier. Defaults to 'saves'.
+
+        Returns:
+            la valeur au bout du chemin
+        """
+        return SaveStore.get_store(filename).get(path)
+
+    def set(path, value, filename : str = 'saves') -> None:
+        """change la valeur au bout d'un chemin
+
+        Args:
+            path (tuple | str): chemin d'acces
+            value: nouvelle valeur
+            filename (str, optional): nom du fichier. Defaults to 'saves'.
+        """
+        SaveStore.get_store(filename).set(path, value)
+
+    def delete(path, filename : str = 'saves') -> None:
+        """supprime la clé au bout d'un chemin
+
+        Args:
+            path (tuple | str): chemin d'acces
+            filename (str, optional): nom du fichier. Defaults to 'saves'.
+        """
+        SaveStore.get_store(filename).delete(path)
+
+    def save(filename : str = None) -> None:
+        """envoie tout de suite les modifications au thread d'écriture (point de sauvegarde)
+
+        Args:
+            filename (str, optional): nom du fichier, tous les fichiers si None. Defaults to None.
+        """
+        if filename is None:
+            SaveStore.flush_all()
+        else:
+            SaveStore.get_store(filename).flush()
+
+    def wait_for_saves(timeout : float = None) -> bool:
+        """attend que le thread d'écriture ait écrit toutes les sauvegardes sur le disque
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Raises:
+            Exception: erreur d'écriture d'une sauvegarde
+
+        Returns:
+            bool: True si tout a été écrit
+        """
+        return SaveStore.wait_all(timeout)
+
+    def close(timeout : float = None) -> bool:
+        """écrit toutes les modifications et met à jour les fichiers de sauvegarde complets (fermeture du jeu)
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Returns:
+            bool: True si tout a été écrit
+        """
+        return SaveStore.close_all(timeout)
+
+    def save_if_due() -> None:
+        """écrit sur le disque les fichiers modifiés si l'intervalle de sauvegarde est écoulé"""
+        SaveStore.flush_all_if_due()
+        
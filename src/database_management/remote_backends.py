@@ -0,0 +1,177 @@
+from abc import ABC, abstractmethod
+import json
+import os
+import sqlite3
+import threading
+
+
+class RemoteBackend(ABC):
+    """Interface des bases de données distantes qui gardent les informations des joueurs"""
+    # la file d'envoi n'attend une connexion internet que pour les backends en ligne
+    needs_internet = False
+
+    @abstractmethod
+    def get_user(self, nickname : str) -> dict:
+        """Retourne les informations d'un joueur
+
+        Args:
+            nickname (str): pseudo du joueur
+
+        Returns:
+            dict: informations du joueur, None s'il n'existe pas
+        """
+
+    @abstractmethod
+    def update_users(self, records : dict) -> None:
+        """Met à jour plusieurs joueurs en une seule requête
+
+        Args:
+            records (dict): informations des joueurs, la clé est le pseudo du joueur
+        """
+
+
+class FirebaseBackend(RemoteBackend):
+    """Base de données Firebase du jeu (une mise à jour multi-chemins par lot)"""
+    needs_internet = True
+
+    def __init__(self, database_link):
+        # firebase n'est initialisé qu'au premier envoi, dans le thread de la file d'envoi
+        self.database_link = database_link
+
+    def get_user(self, nickname : str) -> dict:
+        return self.database_link.users_ref.child(nickname).get()
+
+    def update_users(self, records : dict) -> None:
+        self.database_link.users_ref.update(records)
+
+
+class FileBackend(RemoteBackend):
+    """Fichier json local qui remplace Firebase (tests, jeu hors ligne)"""
+
+    def __init__(self, path : str):
+        self.path = path
+
+    def get_users(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def get_user(self, nickname : str) -> dict:
+        return self.get_users().get(nickname)
+
+    def update_users(self, records : dict) -> None:
+        users = self.get_users()
+        users.update(records)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(users, f, indent = 4, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class MemoryBackend(RemoteBackend):
+    """Base de données en mémoire pour les tests, elle peut simuler des pannes réseau"""
+
+    def __init__(self, failures : int = 0):
+        self.users = {}
+        self.batches = []
+        self.failures = failures
+
+    def get_user(self, nickname : str) -> dict:
+        return self.users.get(nickname)
+
+    def update_users(self, records : dict) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("Panne réseau simulée")
+        self.batches.append(dict(records))
+        self.users.update(records)
+
+
+class SQLiteBackend(RemoteBackend):
+    """Base SQLite qui peut remplacer Firebase (serveur de classement hébergé soi-même, tests de charge).
+
+    Les mises à jour d'un lot sont faites en une seule transaction, le pseudo est la clé
+    primaire de la table et un index sur (level, xp) sert au classement.
+    """
+
+    def __init__(self, path : str = 'data/players.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        # la connexion est utilisée par le thread de la file d'envoi et par le jeu
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS players (
+                    nickname TEXT PRIMARY KEY,
+                    dungeons INTEGER NOT NULL,
+                    money INTEGER NOT NULL,
+                    level INTEGER NOT NULL,
+                    xp INTEGER NOT NULL
+                )""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS players_level ON players (level DESC, xp DESC)")
+
+    @staticmethod
+    def to_record(row) -> dict:
+        nickname, dungeons, money, level, xp = row
+        return {'nickname' : nickname, 'dungeons' : dungeons, 'money' : money, 'level' : [level, xp]}
+
+    def get_user(self, nickname : str) -> dict:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT nickname, dungeons, money, level, xp FROM players WHERE nickname = ?", (nickname,)
+            ).fetchone()
+        return None if row is None else self.to_record(row)
+
+    def get_leaderboard(self, limit : int = 10) -> list:
+        """Retourne les meilleurs joueurs
+
+        Args:
+            limit (int, optional): nombre de joueurs. Defaults to 10.
+
+        Returns:
+            list[dict]: informations des joueurs, du meilleur au moins bon
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT nickname, dungeons, money, level, xp FROM players ORDER BY level DESC, xp DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self.to_record(row) for row in rows]
+
+    def update_users(self, records : dict) -> None:
+        rows = [
+            (nickname, record['dungeons'], record['money'], record['level'][0], record['level'][1])
+            for nickname, record in records.items()
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany("""
+                INSERT INTO players (nickname, dungeons, money, level, xp) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (nickname) DO UPDATE SET
+                    dungeons = excluded.dungeons, money = excluded.money, level = excluded.level, xp = excluded.xp
+                """, rows)
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+# base de données choisie pour ce déploiement : MYSTERYLAND_PLAYER_BACKEND=sqlite pour une base locale
+PLAYER_BACKEND = os.environ.get("MYSTERYLAND_PLAYER_BACKEND", "firebase")
+
+
+def create_backend(database_link, name : str = None) -> RemoteBackend:
+    """Crée le backend des informations des joueurs
+
+    Args:
+        database_link (DatabaseLink): lien vers Firebase, utilisé par le backend firebase
+        name (str, optional): "firebase" ou "sqlite", celui du déploiement si None. Defaults to None.
+
+    Returns:
+        RemoteBackend: le backend
+    """
+    name = PLAYER_BACKEND if name is None else name
+    if name == "firebase":
+        return FirebaseBackend(database_link)
+    if name == "sqlite":
+        return SQLiteBackend(os.environ.get("MYSTERYLAND_SQLITE_PATH", 'data/players.db'))
+    raise ValueError(f"Backend inconnu : {name}")
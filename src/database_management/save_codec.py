@@ -0,0 +1,88 @@
+import json
+import os
+import zlib
+
+
+class JsonCodec:
+    """Format d'origine : json indenté, lisible à la main"""
+    name = "json"
+    extension = ".json"
+
+    @staticmethod
+    def dumps(data : dict) -> bytes:
+        return json.dumps(data, indent = 4, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def loads(content : bytes) -> dict:
+        return json.loads(content.decode('utf-8'))
+
+
+class BinaryCodec:
+    """Format binaire compact : json sans espaces compressé avec zlib, après un en-tête.
+
+    Le contenu est le même qu'en json (les tuples deviennent des listes et les clés des chaînes),
+    la lecture et l'écriture se font donc en C (json et zlib) et restent plus rapides que
+    le format json indenté, pour un fichier une quinzaine de fois plus petit.
+    """
+    name = "binary"
+    extension = ".sav"
+    MAGIC = b"MLS2"
+
+    @staticmethod
+    def dumps(data : dict) -> bytes:
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return BinaryCodec.MAGIC + zlib.compress(content)
+
+    @staticmethod
+    def loads(content : bytes) -> dict:
+        if content[:4] != BinaryCodec.MAGIC:
+            raise ValueError("Ce fichier n'est pas une sauvegarde binaire")
+        return json.loads(zlib.decompress(memoryview(content)[4:]))
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec, BinaryCodec)}
+
+# format choisi pour ce déploiement : MYSTERYLAND_SAVE_FORMAT=binary pour le format compact
+SAVE_FORMAT = os.environ.get("MYSTERYLAND_SAVE_FORMAT", JsonCodec.name)
+
+
+def get_codec(name : str = None):
+    """Retourne le codec d'un format de sauvegarde
+
+    Args:
+        name (str, optional): "json" ou "binary", le format du déploiement si None. Defaults to None.
+
+    Returns:
+        JsonCodec | BinaryCodec: le codec
+    """
+    name = SAVE_FORMAT if name is None else name
+    if name not in CODECS:
+        raise ValueError(f"Format de sauvegarde inconnu : {name}")
+    return CODECS[name]
+
+
+def get_codec_from_path(path : str):
+    """Retourne le codec correspondant à l'extension d'un fichier"""
+    extension = os.path.splitext(path)[1]
+    for codec in CODECS.values():
+        if codec.extension == extension:
+            return codec
+    raise ValueError(f"Extension de sauvegarde inconnue : {extension}")
+
+
+def convert(source_path : str, target_path : str) -> None:
+    """Convertit une sauvegarde d'un format à l'autre (le format est déduit de l'extension)
+
+    Args:
+        source_path (str): fichier à lire, par exemple data/saves.json
+        target_path (str): fichier à écrire, par exemple data/saves.sav
+    """
+    with open(source_path, 'rb') as f:
+        data = get_codec_from_path(source_path).loads(f.read())
+    tmp_path = f'{target_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(get_codec_from_path(target_path).dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target_path)
+
@@ -0,0 +1,190 @@
+import json
+import os
+
+from .save_path import set_value, delete_value
+from .save_codec import get_codec_from_path
+from .save_writer import SaveWriter
+
+
+class SaveJournal:
+    """Journal des modifications d'un fichier de sauvegarde.
+
+    Chaque modification est ajoutée à la fin du journal sous forme d'une ligne json
+    ({"op": "set", "path": [...], "value": ...} ou {"op": "delete", "path": [...]}),
+    le fichier de sauvegarde complet (le snapshot, au format json ou binaire selon son
+    extension) n'est réécrit que lors de la compaction. Les écritures se font dans le thread
+    de SaveWriter. Au démarrage on relit le snapshot puis on rejoue le journal.
+    """
+    COMPACT_THRESHOLD = 200
+
+    def __init__(self, snapshot_path : str, compact_threshold : int = COMPACT_THRESHOLD):
+        self.snapshot_path = snapshot_path
+        self.codec = get_codec_from_path(snapshot_path)
+        self.journal_path = f'{os.path.splitext(snapshot_path)[0]}.journal'
+        self.compacting_path = f'{self.journal_path}.compacting'
+        self.compact_threshold = compact_threshold
+        self.records_count = 0
+        self.writer = SaveWriter.get_writer()
+        # clés des tâches du journal dans SaveWriter
+        self.writer_keys = (self.journal_path, f'compact:{self.journal_path}')
+
+    def load(self) -> dict:
+        """Lit le snapshot et rejoue les journaux qui n'ont pas encore été compactés
+
+        Returns:
+            dict: les données à jour
+        """
+        data = self.read_snapshot()
+        data = self.replay(data, self.compacting_path)
+        self.records_count = 0
+        return self.replay(data, self.journal_path, count=True)
+
+    def read_snapshot(self) -> dict:
+        with open(self.snapshot_path, 'rb') as f:
+            return self.codec.loads(f.read())
+
+    def replay(self, data : dict, path : str, count : bool = False) -> dict:
+        """Applique les enregistrements d'un journal sur les données
+
+        Args:
+            data (dict): données de départ
+            path (str): chemin du journal
+            count (bool, optional): compter les enregistrements rejoués pour la prochaine compaction. Defaults to False.
+
+        Returns:
+            dict: les données modifiées
+        """
+        if not os.path.exists(path):
+            return data
+        valid_size = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    record = json.loads(line)
+                except ValueError:
+                    # dernière ligne tronquée par un arrêt brutal
+                    break
+                valid_size += len(line)
+                data = self.apply(data, record)
+                if count:
+                    self.records_count += 1
+        if valid_size < os.path.getsize(path):
+            # on enlève la ligne tronquée pour que les prochains ajouts restent lisibles
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+        return data
+
+    @staticmethod
+    def apply(data : dict, record : dict) -> dict:
+        """Applique un enregistrement sur les données
+
+        Args:
+            data (dict): données
+            record (dict): enregistrement du journal
+
+        Returns:
+            dict: les données modifiées
+        """
+        path = record["path"]
+        if not path:
+            return record["value"] if record["op"] == "set" else {}
+        try:
+            if record["op"] == "set":
+                set_value(data, path, record["value"])
+            else:
+                delete_value(data, path)
+        except (KeyError, IndexError, TypeError):
+            pass
+        return data
+
+    @staticmethod
+    def create_records(data : dict, dirty_paths) -> list:
+        """Crée les enregistrements correspondant aux chemins modifiés
+
+        Args:
+            data (dict): données en mémoire
+            dirty_paths (set[tuple]): chemins modifiés
+
+        Returns:
+            list[dict]: enregistrements à ajouter au journal
+        """
+        records = []
+        for path in dirty_paths:
+            value = data
+            try:
+                for key in path:
+                    value = value[key]
+            except (KeyError, IndexError, TypeError):
+                records.append({"op": "delete", "path": list(path)})
+                continue
+            records.append({"op": "set", "path": list(path), "value": value})
+        return records
+
+    def append(self, records : list) -> None:
+        """Ajoute des enregistrements à la fin du journal (l'écriture se fait dans le thread de SaveWriter)
+
+        Args:
+            records (list[dict]): enregistrements
+        """
+        if not records:
+            return
+        # on sérialise tout de suite, les valeurs peuvent encore changer en mémoire
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        self.writer.append(self.journal_path, lines)
+        self.records_count += len(records)
+        if self.records_count >= self.compact_threshold:
+            self.compact()
+
+    def compact(self, wait : bool = False, timeout : float = None) -> bool:
+        """Intègre le journal dans le snapshot, après les ajouts déjà en attente
+
+        Args:
+            wait (bool, optional): attendre la fin de la compaction. Defaults to False.
+            timeout (float, optional): temps d'attente maximum en secondes si wait. Defaults to None.
+
+        Returns:
+            bool: False si l'attente a dépassé timeout
+        """
+        self.records_count = 0
+        self.writer.call(f'compact:{self.journal_path}', self._compact)
+        if wait:
+            return self.flush(timeout)
+        return True
+
+    def flush(self, timeout : float = None) -> bool:
+        """Attend que les ajouts et la compaction de ce journal soient faits
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Raises:
+            Exception: erreur d'écriture du journal ou de la compaction
+
+        Returns:
+            bool: False si l'attente a dépassé timeout
+        """
+        return self.writer.flush(timeout, self.writer_keys)
+
+    def _compact(self) -> None:
+        if os.path.exists(self.journal_path) and not os.path.exists(self.compacting_path):
+            # les nouveaux enregistrements iront dans un nouveau journal
+            os.replace(self.journal_path, self.compacting_path)
+        if os.path.exists(self.compacting_path):
+            data = self.replay(self.read_snapshot(), self.compacting_path)
+            self.write_snapshot(data)
+            os.remove(self.compacting_path)
+
+    def write_snapshot(self, data : dict) -> None:
+        """Écrit le snapshot de façon atomique (fichier temporaire puis renommage)
+
+        Args:
+            data (dict): données
+        """
+        tmp_path = f'{self.snapshot_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.codec.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
@@ -0,0 +1,80 @@
+import ast
+import re
+from functools import lru_cache
+
+
+PATH_SEGMENT = re.compile(r"""\s*\[\s*("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|-?\d+)\s*\]\s*""")
+
+
+@lru_cache(maxsize=256)
+def _parse_path_string(path : str) -> tuple:
+    keys = []
+    position = 0
+    while position < len(path):
+        match = PATH_SEGMENT.match(path, position)
+        if match is None:
+            raise ValueError(f"Chemin invalide : {path!r}")
+        keys.append(ast.literal_eval(match.group(1)))
+        position = match.end()
+    return tuple(keys)
+
+
+def parse_path(path) -> tuple:
+    """Transforme un chemin en tuple de clés, les chaînes du type '["player"]["life"]'
+    ne sont analysées qu'une seule fois puis gardées en cache
+
+    Args:
+        path (str | tuple | list): chemin d'accès
+
+    Returns:
+        tuple: les clés du chemin, par exemple ("player", "life")
+    """
+    if isinstance(path, str):
+        return _parse_path_string(path)
+    return tuple(path)
+
+
+def get_value(data : dict, path):
+    """Parcourt le dictionnaire en suivant le chemin
+
+    Args:
+        data (dict): données
+        path (str | tuple | list): chemin d'accès
+
+    Returns:
+        la valeur au bout du chemin (ce n'est pas une copie)
+    """
+    for key in parse_path(path):
+        data = data[key]
+    return data
+
+
+def set_value(data : dict, path, value) -> tuple:
+    """Change la valeur au bout du chemin
+
+    Args:
+        data (dict): données
+        path (str | tuple | list): chemin d'accès, il ne doit pas être vide
+        value: nouvelle valeur
+
+    Returns:
+        tuple: le chemin sous forme de tuple
+    """
+    keys = parse_path(path)
+    get_value(data, keys[:-1])[keys[-1]] = value
+    return keys
+
+
+def delete_value(data : dict, path) -> tuple:
+    """Supprime la clé au bout du chemin si elle existe
+
+    Args:
+        data (dict): données
+        path (str | tuple | list): chemin d'accès, il ne doit pas être vide
+
+    Returns:
+        tuple: le chemin sous forme de tuple
+    """
+    keys = parse_path(path)
+    get_value(data, keys[:-1]).pop(keys[-1], None)
+    return keys
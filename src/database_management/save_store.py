@@ -0,0 +1,210 @@
+import os
+import time
+
+from .save_path import get_value, set_value, delete_value
+from .save_journal import SaveJournal
+from .save_writer import SaveWriter
+from .save_codec import CODECS, get_codec, convert
+
+
+class SaveStore:
+    """Garde en mémoire le contenu d'un fichier de sauvegarde json.
+
+    Le fichier n'est lu qu'une seule fois, les lectures se font ensuite en mémoire
+    et les écritures sont repoussées jusqu'au prochain flush (périodique ou à un point
+    de sauvegarde : changement de map, fermeture du jeu...). Un flush n'ajoute au
+    journal que les sous-parties modifiées (voir SaveJournal).
+    """
+    _stores = {}
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self, filename : str, flush_interval : float = FLUSH_INTERVAL):
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self.codec = get_codec()
+        self.migrate()
+        self.journal = SaveJournal(self.path)
+        self.data = self.load()
+        self.dirty_paths = set()
+        self.last_flush = time.monotonic()
+
+    @classmethod
+    def get_store(cls, filename : str):
+        """Retourne le store du fichier, il est créé (et le fichier lu) au premier appel
+
+        Args:
+            filename (str): nom du fichier
+
+        Returns:
+            SaveStore: le store partagé par tout le processus
+        """
+        if filename not in cls._stores:
+            cls._stores[filename] = cls(filename)
+        return cls._stores[filename]
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Écrit sur le disque tous les stores modifiés"""
+        for store in cls._stores.values():
+            store.flush()
+
+    @classmethod
+    def close_all(cls, timeout : float = None) -> bool:
+        """Écrit tous les stores et intègre leurs journaux dans les fichiers de sauvegarde
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes pour chaque store. Defaults to None.
+
+        Raises:
+            Exception: première erreur d'écriture, les autres stores sont quand même fermés
+
+        Returns:
+            bool: False si un store n'a pas fini à temps
+        """
+        done = True
+        errors = []
+        for store in cls._stores.values():
+            try:
+                done = store.close(timeout) and done
+            except Exception as error:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+        return done
+
+    @classmethod
+    def wait_all(cls, timeout : float = None) -> bool:
+        """Attend que le thread d'écriture ait fini les écritures de tous les stores
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Raises:
+            Exception: erreur d'écriture d'un des journaux
+
+        Returns:
+            bool: True si tout a été écrit
+        """
+        keys = [key for store in cls._stores.values() for key in store.journal.writer_keys]
+        return SaveWriter.get_writer().flush(timeout, keys)
+
+    @classmethod
+    def flush_all_if_due(cls) -> None:
+        """Écrit sur le disque les stores modifiés dont l'intervalle de sauvegarde est écoulé"""
+        for store in cls._stores.values():
+            store.flush_if_due()
+
+    @property
+    def path(self) -> str:
+        return f'data/{self.filename}{self.codec.extension}'
+
+    @property
+    def is_dirty(self) -> bool:
+        return len(self.dirty_paths) > 0
+
+    def migrate(self) -> None:
+        """Convertit la sauvegarde quand sa version la plus récente est dans un autre format que celui
+        du déploiement (après un changement de format, l'ancien fichier peut être resté plus vieux).
+        Le journal est commun aux deux formats, il est rejoué ensuite sur le fichier converti."""
+        paths = [f'data/{self.filename}{codec.extension}' for codec in CODECS.values()]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            return
+        # à date égale le fichier du format du déploiement est gardé
+        newest = max(paths, key=lambda path: (os.path.getmtime(path), path == self.path))
+        if newest != self.path:
+            convert(newest, self.path)
+
+    def load(self) -> dict:
+        """Lit le fichier depuis le disque et rejoue le journal
+
+        Returns:
+            dict: dictionnaire du fichier json
+        """
+        return self.journal.load()
+
+    def replace(self, data : dict) -> None:
+        """Remplace tout le contenu du store
+
+        Args:
+            data (dict): nouvelles données
+        """
+        self.data = data
+        self.mark_dirty(())
+
+    def get(self, path):
+        """Lit une valeur en mémoire
+
+        Args:
+            path (str | tuple): chemin d'accès, par exemple ("player", "life")
+
+        Returns:
+            la valeur au bout du chemin
+        """
+        return get_value(self.data, path)
+
+    def set(self, path, value) -> None:
+        """Change une valeur et marque son chemin comme modifié
+
+        Args:
+            path (str | tuple): chemin d'accès
+            value: nouvelle valeur
+        """
+        self.mark_dirty(set_value(self.data, path, value))
+
+    def delete(self, path) -> None:
+        """Supprime une clé et marque son chemin comme modifié
+
+        Args:
+            path (str | tuple): chemin d'accès
+        """
+        self.mark_dirty(delete_value(self.data, path))
+
+    def mark_dirty(self, path : tuple) -> None:
+        """Marque une sous-partie des données comme modifiée
+
+        Args:
+            path (tuple): chemin de la sous-partie modifiée, () pour tout le fichier
+        """
+        path = tuple(path)
+        for dirty_path in self.dirty_paths:
+            if path[:len(dirty_path)] == dirty_path:
+                # un parent est déjà marqué
+                return
+        self.dirty_paths = {dirty_path for dirty_path in self.dirty_paths if dirty_path[:len(path)] != path}
+        self.dirty_paths.add(path)
+
+    def flush(self) -> bool:
+        """Ajoute les modifications au journal si des données ont été modifiées
+
+        Returns:
+            bool: True si des enregistrements ont été envoyés au journal
+        """
+        self.last_flush = time.monotonic()
+        if not self.is_dirty:
+            return False
+        self.journal.append(SaveJournal.create_records(self.data, self.dirty_paths))
+        self.dirty_paths.clear()
+        return True
+
+    def close(self, timeout : float = None) -> bool:
+        """Écrit les modifications et attend que le journal soit intégré au fichier de sauvegarde
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Returns:
+            bool: False si l'attente a dépassé timeout (le journal sera intégré au prochain lancement)
+        """
+        self.flush()
+        return self.journal.compact(wait=True, timeout=timeout)
+
+    def flush_if_due(self) -> bool:
+        """Écrit le fichier si l'intervalle de sauvegarde est écoulé
+
+        Returns:
+            bool: True si le fichier a été écrit
+        """
+        if time.monotonic() - self.last_flush < self.flush_interval:
+            return False
+        return self.flush()
@@ -0,0 +1,120 @@
+import logging
+import os
+import threading
+
+
+class SaveWriter:
+    """Thread unique qui fait toutes les écritures de sauvegarde à la place de la boucle du jeu.
+
+    Les écritures attendent dans une file, une seule par fichier : si plusieurs ajouts
+    visent le même journal avant que le thread ne s'en occupe ils sont regroupés en une
+    seule écriture, et un nouveau contenu complet remplace celui qui attendait encore.
+
+    L'erreur d'une tâche est écrite dans les logs et gardée avec la clé de la tâche (chemin du
+    fichier ou clé donnée à call) : seul un flush qui attend cette clé la relance.
+    """
+    _writer = None
+
+    def __init__(self):
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.running = None
+        self.errors = {}
+        self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get_writer(cls):
+        """Retourne le thread d'écriture partagé, il est lancé au premier appel
+
+        Returns:
+            SaveWriter: le thread d'écriture
+        """
+        if cls._writer is None:
+            cls._writer = cls()
+        return cls._writer
+
+    def append(self, path : str, text : str) -> None:
+        """Ajoute du texte à la fin d'un fichier (fsync compris)
+
+        Args:
+            path (str): chemin du fichier
+            text (str): texte à ajouter
+        """
+        with self.condition:
+            job = self.pending.get(path)
+            if job is not None and job[0] == "append":
+                job[1].append(text)
+            else:
+                self.pending[path] = ("append", [text])
+            self.condition.notify()
+
+    def call(self, key : str, function) -> None:
+        """Exécute une fonction dans le thread d'écriture, après les écritures déjà en attente
+
+        Args:
+            key (str): identifiant de la tâche, une tâche en attente avec la même clé est remplacée
+            function (callable): fonction sans argument
+        """
+        with self.condition:
+            self.pending.pop(key, None)
+            self.pending[key] = ("call", function)
+            self.condition.notify()
+
+    def flush(self, timeout : float = None, keys=None) -> bool:
+        """Attend que les écritures en attente soient faites
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+            keys (iterable, optional): clés des tâches attendues, dont les erreurs sont relancées.
+                Toutes les tâches si None, sans relancer d'erreur (elles sont déjà dans les logs). Defaults to None.
+
+        Raises:
+            Exception: la dernière erreur d'une des tâches attendues
+
+        Returns:
+            bool: True si tout a été écrit avant la fin du temps d'attente
+        """
+        with self.condition:
+            if keys is None:
+                return self.condition.wait_for(lambda: not self.pending and self.running is None, timeout)
+            keys = set(keys)
+            done = self.condition.wait_for(lambda: keys.isdisjoint(self.pending) and self.running not in keys, timeout)
+            errors = [self.errors.pop(key) for key in keys if key in self.errors]
+        if errors:
+            raise errors[0]
+        return done
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                path = next(iter(self.pending))
+                job = self.pending.pop(path)
+                self.running = path
+            error = None
+            try:
+                if job[0] == "append":
+                    self._append(path, "".join(job[1]))
+                else:
+                    job[1]()
+            except Exception as job_error:
+                # le thread doit continuer à vider la file, sinon flush attendrait pour toujours
+                logging.getLogger(__name__).exception("Échec de la tâche d'écriture %s", path)
+                error = job_error
+            finally:
+                with self.condition:
+                    if error is None:
+                        # une tâche réussie remplace l'échec de la précédente avec la même clé
+                        self.errors.pop(path, None)
+                    else:
+                        self.errors[path] = error
+                    self.running = None
+                    self.condition.notify_all()
+
+    @staticmethod
+    def _append(path : str, text : str) -> None:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+
+from .save_writer import SaveWriter
+
+
+class SyncQueue:
+    """File d'envoi des informations des joueurs vers la base de données distante.
+
+    Les mises à jour sont d'abord ajoutées à un fichier local (une ligne json par mise à jour,
+    écrite par SaveWriter), seule la dernière mise à jour de chaque joueur est gardée et le
+    fichier est réécrit avec ce qui reste à envoyer après chaque envoi réussi. Un thread les envoie ensuite par lots
+    au backend et réessaie avec un délai de plus en plus long tant que l'envoi échoue.
+    Avec un ConnectivityMonitor, aucun envoi vers un backend en ligne n'est tenté quand
+    le jeu est hors ligne.
+    """
+    MIN_RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, backend, path : str = 'data/sync_queue.jsonl', connectivity=None):
+        self.backend = backend
+        self.connectivity = connectivity
+        self.path = path
+        self.writer = SaveWriter.get_writer()
+        # clés des tâches de la file dans SaveWriter, les autres (journaux des sauvegardes) ne la concernent pas
+        self.writer_keys = (self.path, f'sync:{self.path}')
+        self.condition = threading.Condition()
+        self.pending = self.load()
+        self.sending = False
+        self.retry_delay = self.MIN_RETRY_DELAY
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="sync-queue", daemon=True)
+        self.thread.start()
+
+    def load(self) -> dict:
+        """Relit les mises à jour qui n'avaient pas encore été envoyées
+
+        Returns:
+            dict: mises à jour en attente, la clé est le pseudo du joueur
+        """
+        pending = {}
+        if not os.path.exists(self.path):
+            return pending
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    nickname, record = json.loads(line)
+                except ValueError:
+                    # ligne tronquée par un arrêt brutal
+                    continue
+                pending[nickname] = record
+        return pending
+
+    @staticmethod
+    def to_line(nickname : str, record : dict) -> str:
+        return json.dumps([nickname, record], ensure_ascii=False) + "\n"
+
+    def persist(self) -> None:
+        """Réécrit le fichier local avec les mises à jour qui restent à envoyer (dans le thread de SaveWriter)"""
+        with self.condition:
+            lines = "".join(self.to_line(nickname, record) for nickname, record in self.pending.items())
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def enqueue(self, nickname : str, record : dict) -> None:
+        """Ajoute une mise à jour, elle remplace celle du même joueur qui n'a pas encore été envoyée
+
+        Args:
+            nickname (str): pseudo du joueur
+            record (dict): informations du joueur
+        """
+        with self.condition:
+            self.pending[nickname] = record
+            self.writer.append(self.path, self.to_line(nickname, record))
+            # une nouvelle mise à jour relance l'envoi sans attendre la fin du délai
+            self.retry_delay = self.MIN_RETRY_DELAY
+            self.condition.notify_all()
+
+    def flush(self, timeout : float = None) -> bool:
+        """Attend que toutes les mises à jour soient envoyées
+
+        Args:
+            timeout (float, optional): temps d'attente maximum en secondes. Defaults to None.
+
+        Raises:
+            Exception: erreur d'écriture du fichier local
+
+        Returns:
+            bool: True si tout a été envoyé, sinon les mises à jour restent dans le fichier local
+        """
+        with self.condition:
+            sent = self.condition.wait_for(lambda: not self.pending and not self.sending, timeout)
+        # le fichier local doit être à jour avant de quitter le jeu
+        self.writer.flush(timeout, self.writer_keys)
+        return sent
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def wait_before_retry(self) -> None:
+        """Attend avant le prochain essai, ou moins si une nouvelle mise à jour arrive (appelé avec le verrou)"""
+        delay = self.retry_delay
+        self.retry_delay = min(self.retry_delay * 2, self.MAX_RETRY_DELAY)
+        self.condition.wait(delay)
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if self.closed:
+                    return
+                if self.backend.needs_internet and self.connectivity is not None and not self.connectivity.is_online():
+                    self.wait_before_retry()
+                    continue
+                batch = dict(self.pending)
+                self.sending = True
+            try:
+                self.backend.update_users(batch)
+            except Exception:
+                with self.condition:
+                    self.sending = False
+                    self.condition.notify_all()
+                    self.wait_before_retry()
+                continue
+            with self.condition:
+                for nickname, record in batch.items():
+                    # une mise à jour plus récente a pu arriver pendant l'envoi
+                    if self.pending.get(nickname) is record:
+                        del self.pending[nickname]
+                self.writer.call(self.writer_keys[1], self.persist)
+                self.sending = False
+                self.retry_delay = self.MIN_RETRY_DELAY
+                self.condition.notify_all()
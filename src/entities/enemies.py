@@ -16,16 +16,31 @@ class Enemies(Entity):
         self.vision = py.Rect(self.rect.x, self.rect.y, 300, 300)
         self.vision.center = (self.position[0], self.position[1])
         
-    def is_entity_visible(self, entity : Entity):
+    def look_for_targets(self, spatial_hash, target_type, flow_fields=None) -> None:
+        """Cherche les cibles dans les cases de la map autour de la vision de l'ennemi et suit la plus proche
+
+        Args:
+            spatial_hash (SpatialHash): entités de la map
+            target_type (type): type des entités attaquées (Player)
+            flow_fields (FlowFields, optional): champs de flux de la map pour contourner les murs. Defaults to None.
+        """
         self.update_vision_rect()
-        if py.Rect.colliderect(entity.rect, self.vision):
-            self.follow_entity(entity)
-            self.damage_entity(entity)
+        targets = spatial_hash.query(self.vision, target_type)
+        if targets:
+            target = min(targets, key=lambda entity: math.hypot(entity.position[0] - self.position[0], entity.position[1] - self.position[1]))
+            self.follow_entity(target, flow_fields)
+            self.damage_entities(spatial_hash, target_type)
         else:
             self.ai()
-            
-    def damage_entity(self, entity):
-        if self.check_entity_collision(entity):
+
+    def damage_entities(self, spatial_hash, target_type) -> None:
+        """Blesse toutes les entités du type donné que l'ennemi touche
+
+        Args:
+            spatial_hash (SpatialHash): entités de la map
+            target_type (type): type des entités attaquées
+        """
+        for entity in spatial_hash.query(self.rect, target_type):
             entity.life -= self.attack
             
     def animate_ennemy(self, old_position):
@@ -42,9 +57,20 @@ class Enemies(Entity):
             self.moving, self.direction = True, 1
             self.change_animation('walk_up')
         
-    def follow_entity(self, entity : Entity) -> None:
+    def follow_entity(self, entity : Entity, flow_fields=None) -> None:
         dx, dy = entity.position[0] - self.position[0], entity.position[1] - self.position[1]
+        if flow_fields is not None:
+            # le champ de la cible (partagé par tous les ennemis) donne la case suivante sans traverser les murs,
+            # en ligne droite quand l'ennemi est hors du champ ou déjà sur la case de la cible
+            field = flow_fields.follow(entity, *entity.feet.center)
+            # pieds de l'ennemi calculés depuis sa position (son rect n'est mis à jour que dans un groupe)
+            x, y = self.position[0] + self.rect.width / 2, self.position[1] + self.rect.height - self.feet.height / 2
+            target = flow_fields.get_target(field, x, y)
+            if target is not None:
+                dx, dy = target[0] - x, target[1] - y
         dist = math.hypot(dx, dy)
+        if dist == 0:
+            return
         dx, dy = dx / dist, dy / dist
         old_position = [self.position[0], self.position[1]]
         self.position[0] += dx * (self.speed / 1.3)
@@ -92,6 +92,8 @@ class Entity(Animation):
         self.moving = False
         self.direction = 0
         self.speed = 2
+        # SpatialHash des maps où l'entité est rangée, remplis par SpatialHash.insert
+        self.spatial_hashes = set()
         
     def update(self) -> None:
         """Met à jour la page
@@ -104,7 +106,33 @@ class Entity(Animation):
         """
         self.rect.topleft = self.position
         self.feet.midbottom = self.rect.midbottom
+        self.update_spatial_hashes()
         self.idling()
+
+    def update_spatial_hashes(self) -> None:
+        """Range l'entité dans ses nouvelles cases des SpatialHash où elle est, après un changement de rect
+
+        Args:
+            La fonction ne prends aucun argument
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        for spatial_hash in self.spatial_hashes:
+            spatial_hash.update(self)
+
+    def kill(self) -> None:
+        """Retire l'entité de ses groupes et de ses SpatialHash
+
+        Args:
+            La fonction ne prends aucun argument
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        for spatial_hash in list(self.spatial_hashes):
+            spatial_hash.remove(self)
+        super().kill()
         
     def save_location(self) -> None:
         """Sauvgarde la position
@@ -261,5 +289,6 @@ class Entity(Animation):
         """
         self.position = self.old_position
         self.rect.topleft = self.position
-        self.feet.midbottom = self.rect.midbottom        
+        self.feet.midbottom = self.rect.midbottom
+        self.update_spatial_hashes()
     
@@ -100,6 +100,25 @@ class Basicnpc(NPC):
         
     def set_path_coordinates(self, coordinates_list) -> list[list[int]]:
         self.coordinates_list = coordinates_list
+        self.nb_points = len(coordinates_list)
+
+    def has_path(self) -> bool:
+        return bool(self.points)
+
+    def wait_at_spawn(self, spawn) -> None:
+        """Place le NPC immobile sur la case de départ de son trajet, en attendant que le trajet soit calculé
+
+        Args:
+            spawn (list[int]): case de départ (ligne, colonne)
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        self.points = []
+        self.moving = False
+        self.position[0] = spawn[1] * 16
+        self.position[1] = spawn[0] * 16
+        self.save_location()
         
     def load_points(self, points_list) -> None:
         """Charge les points de trajectoires des NPCS Basiques
@@ -116,6 +135,7 @@ class Basicnpc(NPC):
         #     rect.center = (point.x + (point.width / 2), point.y + (point.height / 2))
         #     self.points.append(rect)
         
+        self.points = []
         for num in points_list:
             # print(len(points_list))
             rect = py.Rect(num[1] * 16, num[0] * 16 , 10, 10)
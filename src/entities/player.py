@@ -4,6 +4,9 @@ from entities.npc import Basicnpc
 from .entity import Entity
 from database_management.json_management import JsonManagement as JM
 from database_management.database_link import DatabaseLink
+from database_management.remote_backends import create_backend
+from database_management.sync_queue import SyncQueue
+from database_management.connectivity import ConnectivityMonitor
 
 class Player(Entity):
     def __init__(self, x, y, life):
@@ -22,9 +25,7 @@ class Player(Entity):
         Returns:
             _type_: position du joueur
         """
-        f = JM.open_file("saves")
-        player_position = JM.get_specific_information(f'["player"]["position"]["{world}"]')
-        return player_position
+        return JM.get(("player", "position", world))
     
     def change_player_position(self, world):
         """Change la position du joueur
@@ -36,11 +37,7 @@ class Player(Entity):
             La fonction ne retourne rien --> None
         """
         current_player_position = [self.rect.x, self.rect.y]
-        player_p = JM.open_file("saves")
-        
-        player_p["player"]["position"][world] = current_player_position
-        
-        JM.write_file('saves', player_p)
+        JM.set(("player", "position", world), current_player_position)
         
     @staticmethod
     def get_life() -> int:
@@ -52,9 +49,7 @@ class Player(Entity):
         Returns:
             _type_: retourne la vie acuel du joueur
         """
-        f = JM.open_file("saves")
-        life = JM.get_specific_information('["player"]["life"]')
-        return life
+        return JM.get(("player", "life"))
     
     def change_player_life(self, life: int):
         """Ecrit dans le fichier "saves.json" la vie du joueur
@@ -65,11 +60,7 @@ class Player(Entity):
         Returns :
             La fonction ne retourne rien --> None
         """
-        player_l = JM.open_file("saves")
-        
-        player_l["player"]["life"] = life
-        
-        JM.write_file('saves', player_l)
+        JM.set(("player", "life"), life)
         
     def is_dead(self):
         """Vérifie si le joueur est mort
@@ -85,12 +76,15 @@ class Player(Entity):
 
     
 class PlayerInformation(DatabaseLink):
-    def __init__(self):
+    def __init__(self, backend=None, connectivity=None):
         super().__init__()
+        self.connectivity = ConnectivityMonitor() if connectivity is None else connectivity
+        self.backend = create_backend(self) if backend is None else backend
+        self.sync_queue = SyncQueue(self.backend, connectivity=self.connectivity)
         
     
     def update_user_informations(self, user_name: str, dungeons: int, money: int, level: int, xp: int):
-        """_summary_
+        """Ajoute les informations du joueur à la file d'envoi, elles sont envoyées en arrière-plan
 
         Args:
             user_name (str): nom du joueur
@@ -99,18 +93,27 @@ class PlayerInformation(DatabaseLink):
             level (int): nombre de level
             xp (int): nombre d'xp
 
-        Returns:
-            _type_: return les informations concernant le joueur 
+        Returns :
+            La fonction ne retourne rien --> None
         """
-        return self.users_ref.update({
-            user_name : {
-                'nickname' : user_name,
-                'dungeons' : dungeons,
-                'money' : money,
-                'level' : [level, xp],
-            }
+        self.sync_queue.enqueue(user_name, {
+            'nickname' : user_name,
+            'dungeons' : dungeons,
+            'money' : money,
+            'level' : [level, xp],
         })
         
+    def get_user_informations(self, user_name: str) -> dict:
+        """Lit les informations d'un joueur dans la base de donnée
+
+        Args:
+            user_name (str): nom du joueur
+
+        Returns:
+            dict: informations du joueur, None s'il n'existe pas
+        """
+        return self.backend.get_user(user_name)
+        
     def get_json_informations(self):
         """Obtient les informations depuis le json
 
@@ -120,7 +123,7 @@ class PlayerInformation(DatabaseLink):
         Returns:
             _type_: return les information précise concernant le joueur, méthode utilisée par les autres en haut
         """
-        return JM.get_specific_information('["player"]["database_data"]')
+        return JM.get(("player", "database_data"))
 
 
 class NewPlayer:
@@ -1,5 +1,5 @@
+import logging
 import pygame as py
-import requests
 import pygame_widgets
 from entities.enemies import Enemies
 from entities.player import Player, PlayerInformation, NewPlayer
@@ -12,6 +12,9 @@ from animation import Introduction, VolLivreAnimation, KidnappingAnimation
 
 CLOCK = py.time.Clock()
 FPS = 60
+SYNC_TIMEOUT = 3
+# le jeu se ferme même si le thread d'écriture est bloqué, le journal sera relu au prochain lancement
+SAVE_TIMEOUT = 5
 
 class Game:
     def __init__(self, screen_width: int, screen_height: int):
@@ -20,6 +23,10 @@ class Game:
         self.screen = self.create_screen()
         
         self.player_informations = PlayerInformation()
+        if self.player_informations.backend.needs_internet:
+            # firebase s'initialise pendant que le menu s'affiche
+            self.player_informations.warm_up()
+        self.player_informations.connectivity.refresh()
         self.new_player_menu = NewPlayerMenu(self.screen, self)
         
         self.menu = Menu(self.screen)
@@ -86,7 +93,7 @@ class Game:
         self.introduction = Introduction(self.player, self.screen)
         self.vol_livre_animation = VolLivreAnimation(self.screen, self.player, self.map_manager)
         self.kidnapping_animation = KidnappingAnimation(self.player, self.map_manager, self.screen)
-        if not JM.get_specific_information('["player"]["animations_finished"]["introduction"]'):
+        if not JM.get(("player", "animations_finished", "introduction")):
             self.introduction.teleport_player([1712, 2128])
         
     def is_new_game(self) -> bool:
@@ -98,7 +105,7 @@ class Game:
         Returns:
             bool: retourne un booleen qui correspond à l'etat de la partie, True si elle est nouvelle sinon False
         """
-        return JM.get_specific_information('["player"]["new_game"]')
+        return JM.get(("player", "new_game"))
         
     def change_game_status(self, state : bool) -> None:
         """Change l'état du jeu quand une nouvelle partie est créee
@@ -109,9 +116,7 @@ class Game:
         Returns :
             La fonction ne retourne rien --> None
         """
-        new_game = JM.open_file('saves')
-        new_game["player"]["new_game"] = state
-        JM.write_file('saves', new_game)
+        JM.set(("player", "new_game"), state)
         
     def database_update_quitting(self) -> None:
         """Sauvegarde les données du joueur dans une base de donnée
@@ -123,6 +128,7 @@ class Game:
             La fonction ne retourne rien --> None
         """
         informations = self.player_informations.get_json_informations()
+        # la mise à jour est toujours gardée dans la file, elle partira à la prochaine connexion
         self.player_informations.update_user_informations(
             informations["nickname"],
             informations["dungeons"],
@@ -130,9 +136,13 @@ class Game:
             informations["level"][0],
             informations["level"][1]
         )
+        # les backends locaux (sqlite, fichier) n'ont pas besoin d'internet, comme dans SyncQueue.run
+        if not self.player_informations.backend.needs_internet or self.check_internet_connection():
+            # ce qui n'est pas envoyé à temps reste dans data/sync_queue.jsonl pour la prochaine partie
+            self.player_informations.sync_queue.flush(SYNC_TIMEOUT)
         
     def check_internet_connection(self) -> bool:
-        """Fais une requette internet pour savoir si l'ordinateur est connecté à internet
+        """Regarde si l'ordinateur est connecté à internet, sans attendre (la vérification se fait en arrière-plan)
 
         Args
             La fonction ne prends aucun argument
@@ -140,13 +150,7 @@ class Game:
         Returns:
             bool: renvoie l'état de la connexion, True si connecté sinon False
         """
-        url = "http://www.google.com"
-        timeout = 5
-        try:
-            request = requests.get(url, timeout=timeout)
-            return True
-        except (requests.ConnectionError, requests.Timeout) as exception:
-            return False
+        return self.player_informations.connectivity.is_online()
         
     def ouvrir_menu(self) -> None:
         """Ouvre le menu
@@ -178,11 +182,19 @@ class Game:
         Returns :
             La fonction ne retourne rien --> None
         """
+        # une sauvegarde qui échoue ne doit pas empêcher les suivantes ni la fermeture du jeu
         if self.playing:
             self.player.change_player_position(self.map_manager.current_map)
             self.player.change_player_life(self.player.life)
-            if self.check_internet_connection:
+            try:
                 self.database_update_quitting()
+            except Exception:
+                logging.getLogger(__name__).exception("Échec de l'envoi des informations du joueur")
+        try:
+            JM.save()
+            JM.wait_for_saves(SAVE_TIMEOUT)
+        except Exception:
+            logging.getLogger(__name__).exception("Échec de l'écriture des sauvegardes")
             
     def end_game(self):
         py.draw.rect(self.screen, (0, 0, 0), (0, 0, self.screen.get_width(), self.end_game_box_size))
@@ -201,6 +213,7 @@ class Game:
         if self.is_new_game():
             NewPlayer.create_new_player_informations(self.new_player_menu.box.getText(), self.player_informations)
             self.change_game_status(False)
+            JM.save('saves')
             self.initialise_game()
 
             
@@ -276,10 +289,7 @@ class Game:
                 self.update()
                 self.map_manager.draw()
                 self.dialog_box.render(self.screen)
-                self.ennemy.is_entity_visible(self.player)
-
-                current_map = self.map_manager.get_map()
-                checkpoints = Checkpoints.get_checkpoints(current_map.tmx_data)
+                self.ennemy.look_for_targets(self.map_manager.get_map().spatial_hash, Player, self.map_manager.get_map().flow_fields)
 
 
                 if self.introduction.introduction:
@@ -320,7 +330,8 @@ class Game:
                     
 
                 if self.player.is_dead():
-                    Checkpoints.teleport_to_checkpoints(self.player, checkpoints)
+                    # checkpoints rangés dans un arbre au chargement de la map
+                    Checkpoints.teleport_to_checkpoints(self.player, self.map_manager.get_map().checkpoint_index)
                     self.player.life = 100
 
                 if not self.vol_livre_animation.animation_complete and start_thief_animation:
@@ -349,6 +360,7 @@ class Game:
                 
             
             py.display.flip()
+            JM.save_if_due()
             for event in py.event.get():
                 
                 if event.type == py.QUIT:
@@ -368,4 +380,9 @@ class Game:
                         self.open_quest_menu = not self.open_quest_menu
                 
                         
-        py.quit()
\ No newline at end of file
+        try:
+            JM.close(SAVE_TIMEOUT)
+        except Exception:
+            logging.getLogger(__name__).exception("Échec de la compaction des sauvegardes")
+        finally:
+            py.quit()
\ No newline at end of file
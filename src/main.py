@@ -1,6 +1,6 @@
 import sys, subprocess, pkg_resources
 
-required = {"pygame", "pyscroll", "pytmx", "firebase_admin", "requests", "pygame_widgets", "dataclasses"}
+required = {"pygame", "pyscroll", "pytmx", "firebase_admin", "requests", "pygame_widgets", "dataclasses", "numpy"}
 installed = {pkg.key for pkg in pkg_resources.working_set}
 missing = required - installed
 
@@ -1,2 +1,10 @@
-from .map import MapManager
-from .checkpoints import Checkpoints
\ No newline at end of file
+from .checkpoints import Checkpoints
+
+
+def __getattr__(name : str):
+    # MapManager charge pygame et pyscroll : il n'est importé qu'à la première demande (from maps import MapManager),
+    # pour que les outils hors ligne comme python -m maps démarrent sans eux
+    if name == "MapManager":
+        from .map import MapManager
+        return MapManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
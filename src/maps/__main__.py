@@ -0,0 +1,22 @@
+from .hierarchical import HierarchicalPathFinder
+from .map_cache import MapCache
+from .pathfinding import PathFinder
+from .route_batch import RouteBatch
+from .route_cache import RouteCache
+from .routes import ROUTES
+
+
+# précompile toutes les maps, leurs graphes de recherche hiérarchique et leurs trajets de PNJ (sur tous les coeurs)
+# depuis la racine du dépôt : PYTHONPATH=src python -m maps
+if __name__ == '__main__':
+    for map_name in MapCache.get_map_names():
+        try:
+            grid = MapCache.get_artifacts(map_name).collision_grid
+            HierarchicalPathFinder.load(map_name, PathFinder(grid), RouteCache.fingerprint(grid))
+            print(f"{map_name} : ok")
+        except Exception as error:
+            print(f"{map_name} : {error}")
+
+    routes = {map_name : ROUTES[map_name] for map_name in MapCache.get_map_names() if map_name in ROUTES}
+    for map_name, (count, unreachable) in RouteBatch.precompute(routes).items():
+        print(f"{map_name} : {count} trajets calculés, {unreachable} sans chemin")
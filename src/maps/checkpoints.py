@@ -9,56 +9,70 @@ class Checkpoint:
     height : int
     name : str
 
-class Checkpoints:
-    def get_checkpoints(tmx_data):
-        checkpoints_list = []
-        for obj in tmx_data.objects:
-            if not obj.name is None and "checkpoint" in obj.name:
-                checkpoints_list.append(Checkpoint(obj.x, obj.y, obj.width, obj.height, obj.name))
-        return checkpoints_list
-    
-    @staticmethod
-    def check_checkpoint_distance(entity, checkpoint : Checkpoint) -> float:
-        """Retourne la distance entre deux points avec leurs positions en x et en y
+class CheckpointIndex:
+    """Arbre (kd-tree) des checkpoints d'une map, construit une fois au chargement de la map.
 
-        Args:
-            entity (Entity): L'entitée qui va être téléportée
-            checkpoint (Checkpoint): Le checkpoint cible
+    Le checkpoint le plus proche est trouvé sans calculer la distance à tous les checkpoints
+    (le premier de la liste en cas d'égalité).
+    """
 
-        Returns:
-            float: la distance entre l'entitée et le checkpoint
-        """
-        dx, dy = entity.rect.x - checkpoint.x, entity.rect.y - checkpoint.y
-        return math.hypot(dx, dy)
-    
-    @staticmethod
-    def check_closest_checkpoint(entity, checkpoint_list) -> Checkpoint:
-        """Regarde quel est le checkpoint le plus proche du joueur et le retourner
+    def __init__(self, checkpoints : list):
+        self.checkpoints = list(checkpoints)
+        self.root = self.build(list(range(len(self.checkpoints))), 0)
+
+    def get_coordinate(self, index : int, axis : int) -> float:
+        checkpoint = self.checkpoints[index]
+        return checkpoint.x if axis == 0 else checkpoint.y
+
+    def build(self, indexes : list, depth : int) -> tuple:
+        """Construit un noeud (index du checkpoint, axe, fils gauche, fils droit)"""
+        if not indexes:
+            return None
+        axis = depth % 2
+        indexes.sort(key=lambda index: (self.get_coordinate(index, axis), index))
+        middle = len(indexes) // 2
+        return (indexes[middle], axis, self.build(indexes[:middle], depth + 1), self.build(indexes[middle + 1:], depth + 1))
+
+    def nearest(self, x : float, y : float) -> Checkpoint:
+        """Retourne le checkpoint le plus proche d'un point
 
         Args:
-            entity (Entity): L'entitée qui va être téléportée
-            checkpoint_list (list[Checkpoint]): liste des checkpoints de la map
+            x (float): position x
+            y (float): position y
 
         Returns:
-            Checkpoint: Le checkpoint le plus proche
+            Checkpoint: le checkpoint le plus proche, None si la map n'en a pas
         """
-        closest_checkpoint = None
-        closest_checkpoint_distance = 0
-        for checkpoint in checkpoint_list:
-            distance = Checkpoints.check_checkpoint_distance(entity, checkpoint)
-            if closest_checkpoint is None or distance < closest_checkpoint_distance:
-                closest_checkpoint = checkpoint
-                closest_checkpoint_distance = distance
-        return closest_checkpoint
-                
+        best = [None, math.inf]
+        self.search(self.root, x, y, best)
+        return None if best[0] is None else self.checkpoints[best[0]]
+
+    def search(self, node : tuple, x : float, y : float, best : list) -> None:
+        if node is None:
+            return
+        index, axis, left, right = node
+        checkpoint = self.checkpoints[index]
+        distance = math.hypot(x - checkpoint.x, y - checkpoint.y)
+        if distance < best[1] or (distance == best[1] and index < best[0]):
+            best[0], best[1] = index, distance
+        difference = (x if axis == 0 else y) - self.get_coordinate(index, axis)
+        near, far = (left, right) if difference < 0 else (right, left)
+        self.search(near, x, y, best)
+        # l'autre côté ne peut contenir un checkpoint plus proche que si le plan de coupe est assez près
+        if abs(difference) <= best[1]:
+            self.search(far, x, y, best)
+
+
+class Checkpoints:
     @staticmethod
-    def teleport_to_checkpoints(entity, checkpoint_list) -> None:
-        """Téléporte l'entitée au checkpoint le plus proche
+    def teleport_to_checkpoints(entity, checkpoint_index : CheckpointIndex) -> None:
+        """Téléporte l'entitée au checkpoint le plus proche (rien ne se passe si la map n'en a pas)
 
         Args:
             entity (Entity): L'entitée qui va être téléportée
-            checkpoint_list (list[Checkpoint]): liste des checkpoint de la map
+            checkpoint_index (CheckpointIndex): checkpoints de la map
         """
-        closest_checkpoint = Checkpoints.check_closest_checkpoint(entity, checkpoint_list)
-        entity.position[0], entity.position[1] = closest_checkpoint.x, closest_checkpoint.y
+        closest_checkpoint = checkpoint_index.nearest(entity.rect.x, entity.rect.y)
+        if closest_checkpoint is not None:
+            entity.position[0], entity.position[1] = closest_checkpoint.x, closest_checkpoint.y
 
@@ -0,0 +1,177 @@
+class FlowField:
+    """Distance de chaque case jusqu'à un but et case suivante pour s'en rapprocher (Dijkstra à coût 1,
+    donc un parcours en largeur) sur la grille de collisions d'une map.
+
+    Le champ est calculé une fois par position du but, ensuite chaque entité trouve où aller en
+    lisant sa case (O(1)) au lieu de faire sa propre recherche. Il réutilise les tableaux plats
+    de PathFinder (grille entourée de murs) et ses propres tableaux d'une mise à jour à l'autre :
+    quand le but change de case seules les cases à moins de radius pas sont recalculées, sans
+    remettre à zéro le reste (chaque mise à jour a son numéro, comme les recherches de PathFinder).
+    """
+    def __init__(self, path_finder, radius=None):
+        """
+        Args:
+            path_finder (PathFinder): recherche de chemin de la map (grille de cases bloquées)
+            radius (int, optional): distance maximale (en cases) calculée autour du but. Defaults to None (toute la map).
+        """
+        self.path_finder = path_finder
+        self.radius = radius
+        size = len(path_finder.blocked)
+        self.distances = [0] * size
+        self.next_cells = [0] * size
+        self.stamps = [0] * size
+        self.stamp = 0
+        self.goal = None
+
+    def contains(self, row : int, column : int) -> bool:
+        return 0 <= row < self.path_finder.height and 0 <= column < self.path_finder.width
+
+    def set_goal(self, goal) -> bool:
+        """Déplace le but, le champ n'est recalculé que si le but a changé de case
+
+        Args:
+            goal (tuple): case du but (ligne, colonne)
+
+        Returns:
+            bool: True si le champ a été recalculé
+        """
+        goal = (goal[0], goal[1])
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self.stamp += 1
+        if self.contains(*goal):
+            self.build(self.path_finder.encode(*goal))
+        return True
+
+    def build(self, start : int) -> None:
+        """Parcours en largeur depuis le but, arrêté à radius pas"""
+        stamp = self.stamp
+        stamps = self.stamps
+        distances = self.distances
+        next_cells = self.next_cells
+        blocked = self.path_finder.blocked
+        offsets = self.path_finder.offsets
+        limit = len(blocked) if self.radius is None else self.radius
+
+        # le but peut être sur une case bloquée (le joueur sur une route), il reste le point de départ
+        stamps[start] = stamp
+        distances[start] = 0
+        next_cells[start] = start
+        frontier = [start]
+        distance = 0
+        while frontier and distance < limit:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                for offset in offsets:
+                    neighbour = cell + offset
+                    if stamps[neighbour] != stamp and not blocked[neighbour]:
+                        stamps[neighbour] = stamp
+                        distances[neighbour] = distance
+                        next_cells[neighbour] = cell
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+    def get_distance(self, row : int, column : int):
+        """Retourne le nombre de pas jusqu'au but, None si la case n'est pas atteinte par le champ"""
+        if not self.contains(row, column):
+            return None
+        cell = self.path_finder.encode(row, column)
+        if self.stamps[cell] != self.stamp:
+            return None
+        return self.distances[cell]
+
+    def get_next_cell(self, row : int, column : int):
+        """Retourne la case (ligne, colonne) où aller pour se rapprocher du but
+
+        Args:
+            row (int): ligne de l'entité
+            column (int): colonne de l'entité
+
+        Returns:
+            list[int]: case suivante, None si la case n'est pas atteinte par le champ ou si c'est le but
+        """
+        if not self.contains(row, column):
+            return None
+        cell = self.path_finder.encode(row, column)
+        if self.stamps[cell] != self.stamp or self.next_cells[cell] == cell:
+            return None
+        return self.path_finder.decode(self.next_cells[cell])
+
+
+class FlowFields:
+    """Champs de flux d'une map : un par but fixe (point de quête, porte de shop) et un par entité
+    suivie (le joueur), mis à jour quand elle change de case.
+    """
+    TILE_SIZE = 16
+    # distance (en cases) calculée autour d'une entité suivie, plus grande que la vision des ennemis
+    FOLLOW_RADIUS = 32
+
+    def __init__(self, path_finder):
+        self.path_finder = path_finder
+        self.fields = dict()
+        self.followed = dict()
+
+    @staticmethod
+    def get_cell(x : float, y : float) -> tuple:
+        """Retourne la case (ligne, colonne) d'une position en pixels"""
+        return int(y) // FlowFields.TILE_SIZE, int(x) // FlowFields.TILE_SIZE
+
+    @staticmethod
+    def get_cell_center(cell) -> tuple:
+        """Retourne le centre en pixels (x, y) d'une case (ligne, colonne)"""
+        return cell[1] * FlowFields.TILE_SIZE + FlowFields.TILE_SIZE / 2, cell[0] * FlowFields.TILE_SIZE + FlowFields.TILE_SIZE / 2
+
+    def get_field(self, goal, radius=None) -> FlowField:
+        """Retourne le champ d'un but fixe, calculé au premier appel
+
+        Args:
+            goal (tuple): case du but (ligne, colonne)
+            radius (int, optional): distance maximale calculée autour du but. Defaults to None (toute la map).
+
+        Returns:
+            FlowField: champ du but
+        """
+        key = (goal[0], goal[1], radius)
+        field = self.fields.get(key)
+        if field is None:
+            field = FlowField(self.path_finder, radius)
+            field.set_goal(goal)
+            self.fields[key] = field
+        return field
+
+    def follow(self, entity, x : float, y : float, radius : int = FOLLOW_RADIUS) -> FlowField:
+        """Retourne le champ qui mène à une entité qui bouge, recalculé seulement si elle a changé de case
+
+        Args:
+            entity: entité suivie (le joueur par exemple)
+            x (float): position de l'entité en pixels
+            y (float): position de l'entité en pixels
+            radius (int, optional): distance maximale calculée autour de l'entité. Defaults to FOLLOW_RADIUS.
+
+        Returns:
+            FlowField: champ de l'entité
+        """
+        field = self.followed.get(entity)
+        if field is None:
+            field = FlowField(self.path_finder, radius)
+            self.followed[entity] = field
+        field.set_goal(self.get_cell(x, y))
+        return field
+
+    def get_target(self, field : FlowField, x : float, y : float):
+        """Retourne le point (x, y) en pixels vers lequel avancer depuis une position pour suivre le champ
+
+        Args:
+            field (FlowField): champ suivi
+            x (float): position en pixels
+            y (float): position en pixels
+
+        Returns:
+            tuple: centre de la case suivante, None si la position n'est pas dans le champ ou déjà sur le but
+        """
+        next_cell = field.get_next_cell(*self.get_cell(x, y))
+        if next_cell is None:
+            return None
+        return self.get_cell_center(next_cell)
@@ -0,0 +1,315 @@
+import heapq
+import json
+import os
+
+import numpy as np
+
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+
+
+class HierarchicalPathFinder:
+    """Recherche de chemin hiérarchique (HPA*) sur la grille de collisions d'une map.
+
+    La grille est découpée en blocs de cluster_size cases. Sur chaque frontière entre deux blocs,
+    chaque passage libre donne une ou deux entrées (au milieu, ou à chaque bout s'il est long).
+    Le graphe abstrait relie les entrées qui se touchent (coût 1) et les entrées d'un même bloc
+    (longueur du plus court chemin dans le bloc). Il est construit une fois par grille et gardé
+    dans Maps/cache/<map>.hpa.
+
+    Une recherche relie le départ et l'arrivée aux entrées de leur bloc, cherche dans le graphe
+    abstrait (quelques centaines de noeuds au lieu de toutes les cases), puis ne détaille chaque
+    morceau (une recherche dans un seul bloc) qu'au moment où il est lu (refine).
+
+    Le chemin passe par les entrées et peut donc être un peu plus long que le plus court. Sa longueur
+    est connue avant d'être détaillée : si elle dépasse max_ratio fois la distance de Manhattan
+    (qui est plus courte que le plus court chemin), find_path fait une recherche complète avec
+    PathFinder. Le chemin rendu n'est donc jamais plus long que max_ratio fois le plus court.
+    """
+    CLUSTER_SIZE = 16
+    # un passage plus long que ça a une entrée à chaque bout au lieu d'une au milieu
+    LONG_ENTRANCE = 6
+    MAX_RATIO = 1.5
+    # à changer quand la construction du graphe change, les anciens fichiers seront refaits
+    VERSION = 1
+
+    def __init__(self, path_finder : PathFinder, cluster_size : int = CLUSTER_SIZE, edges : dict = None):
+        """
+        Args:
+            path_finder (PathFinder): grille de la map
+            cluster_size (int, optional): taille d'un bloc en cases. Defaults to CLUSTER_SIZE.
+            edges (dict, optional): graphe abstrait déjà construit (lu dans le cache). Defaults to None.
+        """
+        self.path_finder = path_finder
+        self.cluster_size = cluster_size
+        self.cluster_columns = -(-path_finder.width // cluster_size)
+        self.cluster_ids = self.get_cluster_ids()
+        self.edges = self.build() if edges is None else edges
+
+    def get_cluster_ids(self) -> list:
+        """Numéro de bloc de chaque case (numérotée comme dans PathFinder), -1 pour une case bloquée"""
+        path_finder = self.path_finder
+        rows = np.arange(path_finder.height)[:, None] // self.cluster_size
+        columns = np.arange(path_finder.width)[None, :] // self.cluster_size
+        blocked = np.frombuffer(bytes(path_finder.blocked), dtype=np.uint8).reshape(path_finder.height + 2, path_finder.stride)
+        ids = np.full(blocked.shape, -1, dtype=np.int64)
+        ids[1:-1, 1:-1] = rows * self.cluster_columns + columns
+        ids[blocked != 0] = -1
+        return ids.ravel().tolist()
+
+    def get_cluster(self, cell : int) -> int:
+        """Bloc d'une case d'après sa position (même si elle est bloquée)"""
+        row, column = self.path_finder.decode(cell)
+        return (row // self.cluster_size) * self.cluster_columns + column // self.cluster_size
+
+    def build(self) -> dict:
+        """Construit le graphe abstrait : entrées sur les frontières des blocs puis distances dans chaque bloc
+
+        Returns:
+            dict: voisins de chaque entrée {case : {case voisine : coût}}
+        """
+        path_finder = self.path_finder
+        size = self.cluster_size
+        height, width = path_finder.height, path_finder.width
+        edges = dict()
+        # frontières verticales (entre une colonne et la suivante) puis horizontales, bloc par bloc
+        for column in range(size - 1, width - 1, size):
+            for top in range(0, height, size):
+                self.add_entrances(edges, [(path_finder.encode(row, column), path_finder.encode(row, column + 1))
+                                           for row in range(top, min(top + size, height))])
+        for row in range(size - 1, height - 1, size):
+            for left in range(0, width, size):
+                self.add_entrances(edges, [(path_finder.encode(row, column), path_finder.encode(row + 1, column))
+                                           for column in range(left, min(left + size, width))])
+
+        cluster_nodes = dict()
+        for node in edges:
+            cluster_nodes.setdefault(self.cluster_ids[node], []).append(node)
+        for nodes in cluster_nodes.values():
+            for node in nodes:
+                distances, _ = self.search_cluster(node, self.cluster_ids[node])
+                for other in nodes:
+                    if other != node and other in distances:
+                        edges[node][other] = distances[other]
+        return edges
+
+    def add_entrances(self, edges : dict, pairs : list) -> None:
+        """Ajoute les entrées d'une frontière entre deux blocs
+
+        Args:
+            edges (dict): graphe abstrait
+            pairs (list[tuple[int, int]]): cases qui se font face de chaque côté de la frontière
+        """
+        blocked = self.path_finder.blocked
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and not blocked[pair[0]] and not blocked[pair[1]]:
+                run.append(pair)
+                continue
+            if run:
+                transitions = [run[len(run) // 2]] if len(run) < self.LONG_ENTRANCE else [run[0], run[-1]]
+                for first, second in transitions:
+                    edges.setdefault(first, dict())[second] = 1
+                    edges.setdefault(second, dict())[first] = 1
+                run = []
+
+    def search_cluster(self, start : int, cluster : int, goal : int = None) -> tuple:
+        """Parcours en largeur depuis start sans sortir d'un bloc
+
+        Args:
+            start (int): case de départ
+            cluster (int): bloc parcouru
+            goal (int, optional): arrête le parcours quand cette case est atteinte. Defaults to None.
+
+        Returns:
+            tuple[dict, dict]: distance et case précédente de chaque case atteinte
+        """
+        cluster_ids = self.cluster_ids
+        offsets = self.path_finder.offsets
+        distances = {start : 0}
+        parents = {start : None}
+        frontier = [start]
+        distance = 0
+        while frontier and goal not in distances:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                for offset in offsets:
+                    neighbour = cell + offset
+                    if neighbour not in distances and cluster_ids[neighbour] == cluster:
+                        distances[neighbour] = distance
+                        parents[neighbour] = cell
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return distances, parents
+
+    def find_abstract_path(self, init, goal) -> tuple:
+        """Cherche le chemin dans le graphe abstrait
+
+        Args:
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+
+        Raises:
+            ValueError: aucun chemin n'existe
+
+        Returns:
+            tuple[list[int], int]: cases par lesquelles passe le chemin (départ, entrées, arrivée) et sa longueur
+        """
+        path_finder = self.path_finder
+        edges = self.edges
+        start = path_finder.encode(init[0], init[1])
+        end = path_finder.encode(goal[0], goal[1])
+        if path_finder.blocked[end]:
+            # comme PathFinder, une case bloquée n'est jamais atteinte
+            raise ValueError("Algorithm is unable to find solution")
+
+        if path_finder.blocked[start]:
+            # comme PathFinder, le départ peut être bloqué : il est relié aux blocs de ses voisins libres,
+            # qui ne sont pas forcément dans son bloc (refine refait la même recherche depuis le départ)
+            start_clusters = {self.cluster_ids[start + offset] for offset in path_finder.offsets} - {-1}
+        else:
+            start_clusters = {self.get_cluster(start)}
+        start_links = dict()
+        for start_cluster in start_clusters:
+            start_distances, _ = self.search_cluster(start, start_cluster)
+            for node, distance in start_distances.items():
+                if node != start and (node in edges or node == end) and distance < start_links.get(node, distance + 1):
+                    start_links[node] = distance
+        end_distances, _ = self.search_cluster(end, self.get_cluster(end))
+        end_links = {node : end_distances[node] for node in end_distances if node in edges}
+
+        goal_row, goal_column = divmod(end, path_finder.stride)
+        open_list = [(0, 0, start)]
+        costs = {start : 0}
+        parents = {start : None}
+        while open_list:
+            _, cost, node = heapq.heappop(open_list)
+            if node == end:
+                break
+            if cost > costs[node]:
+                continue
+            neighbours = list(edges.get(node, dict()).items())
+            if node == start:
+                neighbours.extend(start_links.items())
+            if node in end_links:
+                neighbours.append((end, end_links[node]))
+            for neighbour, step in neighbours:
+                new_cost = cost + step
+                if new_cost < costs.get(neighbour, new_cost + 1):
+                    costs[neighbour] = new_cost
+                    parents[neighbour] = node
+                    row, column = divmod(neighbour, path_finder.stride)
+                    heapq.heappush(open_list, (new_cost + abs(row - goal_row) + abs(column - goal_column), new_cost, neighbour))
+        else:
+            raise ValueError("Algorithm is unable to find solution")
+
+        nodes = [end]
+        while parents[nodes[-1]] is not None:
+            nodes.append(parents[nodes[-1]])
+        nodes.reverse()
+        return nodes, costs[end]
+
+    def refine(self, nodes : list):
+        """Détaille le chemin abstrait morceau par morceau, au fur et à mesure qu'il est lu
+
+        Args:
+            nodes (list[int]): cases du chemin abstrait
+
+        Yields:
+            list[int]: cases du chemin (ligne, colonne), de départ à arrivée
+        """
+        decode = self.path_finder.decode
+        yield decode(nodes[0])
+        for first, second in zip(nodes, nodes[1:]):
+            if second - first in self.path_finder.offsets:
+                yield decode(second)
+                continue
+            # les deux cases sont dans le même bloc
+            _, parents = self.search_cluster(first, self.get_cluster(second), second)
+            segment = [second]
+            while parents[segment[-1]] != first:
+                segment.append(parents[segment[-1]])
+            for cell in reversed(segment):
+                yield decode(cell)
+
+    def find_path(self, init, goal, max_ratio : float = MAX_RATIO) -> list:
+        """Retourne un chemin de init à goal au plus max_ratio fois plus long que le plus court
+
+        Args:
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+            max_ratio (float, optional): rapport maximal avec le plus court chemin, None pour ne jamais
+                faire de recherche complète. Defaults to MAX_RATIO.
+
+        Raises:
+            ValueError: aucun chemin n'existe
+
+        Returns:
+            list[list[int]]: cases du chemin, de init à goal
+        """
+        path = self.try_find_path(init, goal, max_ratio)
+        if path is None:
+            return self.path_finder.find_path(init, goal, 1)
+        return path
+
+    def try_find_path(self, init, goal, max_ratio : float = MAX_RATIO) -> list:
+        """Comme find_path, mais sans faire la recherche complète quand le chemin abstrait est trop long
+
+        Args:
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+            max_ratio (float, optional): rapport maximal avec le plus court chemin, None pour toujours
+                rendre le chemin hiérarchique. Defaults to MAX_RATIO.
+
+        Raises:
+            ValueError: aucun chemin n'existe
+
+        Returns:
+            list[list[int]]: cases du chemin, de init à goal, None s'il faut une recherche complète
+        """
+        nodes, length = self.find_abstract_path(init, goal)
+        if max_ratio is not None and length > max_ratio * (abs(init[0] - goal[0]) + abs(init[1] - goal[1])):
+            return None
+        return list(self.refine(nodes))
+
+    @staticmethod
+    def cache_path(name : str) -> str:
+        return os.path.join(MapCache.CACHE_DIRECTORY, f'{name}.hpa')
+
+    @staticmethod
+    def load(name : str, path_finder : PathFinder, fingerprint : str, cluster_size : int = CLUSTER_SIZE):
+        """Retourne la recherche hiérarchique de la map, le graphe est lu dans le cache s'il est à jour
+
+        Args:
+            name (str): nom de la map
+            path_finder (PathFinder): grille de la map
+            fingerprint (str): empreinte de la grille (RouteCache.fingerprint)
+            cluster_size (int, optional): taille d'un bloc en cases. Defaults to CLUSTER_SIZE.
+
+        Returns:
+            HierarchicalPathFinder: recherche hiérarchique de la map
+        """
+        key = [HierarchicalPathFinder.VERSION, fingerprint, cluster_size]
+        path = HierarchicalPathFinder.cache_path(name)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                if content.get("key") == key:
+                    edges = {node : dict(neighbours) for node, neighbours in content["edges"]}
+                    return HierarchicalPathFinder(path_finder, cluster_size, edges)
+            except (OSError, ValueError):
+                # fichier tronqué
+                pass
+
+        hierarchical_path_finder = HierarchicalPathFinder(path_finder, cluster_size)
+        os.makedirs(MapCache.CACHE_DIRECTORY, exist_ok=True)
+        content = json.dumps({
+            "key": key,
+            "edges": [[node, list(neighbours.items())] for node, neighbours in hierarchical_path_finder.edges.items()]
+        }, separators=(',', ':'))
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(f'{path}.tmp', path)
+        return hierarchical_path_finder
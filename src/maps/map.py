@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+import logging
+import numpy as np
 import pygame as py
 import pytmx, pyscroll
 
@@ -6,6 +8,17 @@ from objects.tiled_entity import TiledEntity
 from entities.player import Player
 from entities.npc import Basicnpc, ShopNPC, Voleur
 from database_management import JsonManagement as JM
+from maps.checkpoints import Checkpoint, CheckpointIndex
+from maps.map_cache import MapCache
+from maps.prefetch import MapPrefetcher
+from maps.tileset_registry import TilesetRegistry
+from maps.wall_grid import WallGrid
+from maps.spatial_hash import SpatialHash
+from maps.pathfinding import PathFinder, PathScheduler
+from maps.route_cache import RouteCache
+from maps.routes import ROUTES
+from maps.flow_field import FlowFields
+from maps.hierarchical import HierarchicalPathFinder
 
 
 @dataclass
@@ -15,47 +28,85 @@ class Portal:
     target_world : str
     teleport_point : str 
 
+@dataclass
+class MapObject:
+    x : float
+    y : float
+    width : float
+    height : float
+
+@dataclass
+class MapDescriptor:
+    name : str
+    portals : list
+    npcs : list
+    shops : list
+    sprites : list
+
 @dataclass
 class Map:
     name : str
-    walls : list
     group : pyscroll.PyscrollGroup
     tmx_data : pytmx.TiledMap
     portals : list
     npcs : list
     shops : list
+    objects : dict
+    portal_triggers : list
+    checkpoints : list
+    checkpoint_index : CheckpointIndex
+    collision_grid : np.ndarray
+    path_finder : PathFinder
+    grid_fingerprint : str
+    flow_fields : FlowFields
+    wall_grid : WallGrid
+    spatial_hash : SpatialHash
+    # construit à la première recherche hiérarchique (voir MapManager.get_hierarchical_path_finder)
+    hierarchical_path_finder : HierarchicalPathFinder = None
     
 
 class MapManager:
+    # nombre de maps gardées en mémoire, les moins récemment visitées sont déchargées
+    MAX_LOADED_MAPS = 2
+    # distance (en cases) à partir de laquelle un trajet passe d'abord par la recherche hiérarchique
+    LONG_ROUTE = 2 * HierarchicalPathFinder.CLUSTER_SIZE
+
     def __init__(self, screen: int, player : str, ennemies_list):
         self.screen = screen
         self.player = player
         self.ennemies_list = ennemies_list
         self.maps = dict()
-        self.current_map = JM.get_specific_information('["player"]["current_world"]')
-        self.map_collisions_list = [[0] * 250 for _ in range(250)]
+        self.map_descriptors = dict()
+        self.maps_last_visit = []
+        # les maps voisines sont préparées en arrière-plan avant que le joueur n'y entre
+        self.prefetcher = MapPrefetcher()
+        # les trajets des PNJ qui ne sont pas en cache sont cherchés pendant quelques millisecondes par frame
+        self.path_scheduler = PathScheduler()
+        self.current_map = JM.get(("player", "current_world"))
         self.inhabitants_list = ["Amelia", "Ash", "Bruce", "Bouncer","Conference_man"
                                 , "Dan", "Jack", "Conference_woman", "James"]
-        self.points_list = [[[132, 22], [186, 123]], [[90, 144], [225, 88]], [[233, 168], [118, 30]],
-                            [[188, 132], [234, 13]], [[164, 229], [92, 19]], [[195, 95], [133, 237]],
-                            [[131, 22], [106, 113]], [[183, 148], [118, 98]], [[129, 144], [223, 153]]]
+        # précalculés par python -m maps
+        self.points_list = ROUTES["World_Alpha"]
         self.dialogs_list = []
         for name in self.inhabitants_list:
             self.dialogs_list.extend([f"Salut je suis {name}", "comment vas-tu ?"])
         self.path_list = []
+        self.voleur_library = Voleur(478, 233, "Bruce")
+        self.voleur_world = Voleur(2464, 2940, "Bruce")
 
 
 
-        
+        # les maps ne sont chargées que quand le joueur y entre (voir get_map)
         self.register_map("World_Alpha", portals=[
             Portal(from_world="World_Alpha", origin_point="enter_library", target_world="library", teleport_point="spawn_library"),
         ], npcs=[
-            Basicnpc(name, self.path_length(pos[0], pos[1]), [dialog])for name, pos, dialog in zip(self.inhabitants_list, self.points_list, self.dialogs_list)
-        ])
+            # le nombre de points est connu quand le chemin est calculé (load_path)
+            Basicnpc(name, 0, [dialog]) for name, dialog in zip(self.inhabitants_list, self.dialogs_list)
+        ], sprites=[self.voleur_world])
 
         self.register_map("library", portals=[
             Portal(from_world="library", origin_point="enter_world", target_world="World_Alpha", teleport_point="library_exit"),
-        ])
+        ], sprites=[self.voleur_library])
 
         
         self.load_path()
@@ -69,18 +120,74 @@ class MapManager:
         
             
     def check_npc_collisions(self, dialog_box):
-        for sprite in self.get_group().sprites():
-            if sprite.feet.colliderect(self.player.rect) and type(sprite) is Basicnpc:
-                dialog_box.execute(sprite.dialog_list)
+        for sprite in self.get_talking_npcs():
+            dialog_box.execute(sprite.dialog_list)
+
+    def get_talking_npcs(self) -> list:
+        """Retourne les PNJ assez proches du joueur pour lui parler
+
+        Args:
+            La fonction ne prends aucun argument --> None
+
+        Returns:
+            list[Basicnpc]: PNJ dont les pieds touchent le joueur
+        """
+        # seules les entités des cases autour du joueur sont testées
+        map_data = self.get_map()
+        npcs = [sprite for sprite in map_data.spatial_hash.query(self.player.rect, Basicnpc)
+                if type(sprite) is Basicnpc and sprite.feet.colliderect(self.player.rect)]
+        # même ordre que dans le groupe de la map
+        return sorted(npcs, key=map_data.npcs.index)
 
     def load_path(self):
         count = 0
-        for sprite in self.get_group().sprites():
+        map_data = self.get_map()
+        self.path_list = []
+        for sprite in map_data.group.sprites():
             if isinstance(sprite, Basicnpc):
-                path = self.check_shortest_path(self.map_collisions_list, self.points_list[count][0], self.points_list[count][1], 1, self.heuristic(self.map_collisions_list, self.points_list[count][1]))[0]
-                sprite.set_path_coordinates(path)
+                start, goal = self.points_list[count]
+                # chaque trajet n'est cherché qu'une fois par version de la grille, ensuite il vient du cache
+                path = RouteCache.get_path(map_data.name, map_data.grid_fingerprint, start, goal)
                 self.path_list.append(path)
+                if path is not None:
+                    sprite.set_path_coordinates(path)
+                else:
+                    # le PNJ attend sur son point de départ que la recherche (faite par update) soit finie
+                    sprite.wait_at_spawn(start)
+                    # un long trajet essaie d'abord la recherche hiérarchique, bien plus rapide que la recherche complète
+                    is_long = abs(start[0] - goal[0]) + abs(start[1] - goal[1]) >= self.LONG_ROUTE
+                    self.path_scheduler.request(map_data.path_finder, start, goal,
+                                                lambda path, error, npc=sprite, index=count, map_data=map_data: self.set_npc_path(map_data, npc, index, path, error),
+                                                self.get_hierarchical_path_finder() if is_long else None)
                 count += 1
+
+    def set_npc_path(self, map_data : Map, npc : Basicnpc, index : int, path : list, error : Exception = None) -> None:
+        """Donne à un PNJ son trajet quand la recherche est finie et le garde dans le cache des trajets
+
+        Args:
+            map_data (Map): map du PNJ
+            npc (Basicnpc): PNJ
+            index (int): numéro du trajet dans points_list
+            path (list[list[int]]): trajet trouvé, None si la recherche a échoué
+            error (Exception, optional): erreur de la recherche. Defaults to None.
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        start, goal = self.points_list[index]
+        if path is not None:
+            RouteCache.add_path(map_data.name, map_data.grid_fingerprint, start, goal, path)
+        if not self.path_scheduler.is_busy():
+            # le fichier n'est écrit qu'une fois, quand la dernière recherche est finie (trouvée ou non)
+            RouteCache.save()
+        if path is None:
+            # le PNJ reste sur son point de départ
+            logging.getLogger(__name__).warning("Pas de trajet pour %s sur %s de %s à %s : %s", npc.name, map_data.name, start, goal, error)
+            return
+        self.path_list[index] = path
+        npc.set_path_coordinates(path)
+        npc.load_points(path)
+        npc.teleport_spawn()
         
     def check_collisions(self) -> None:
         """Vérifie si il ya collision ou non 
@@ -91,22 +198,22 @@ class MapManager:
         Returns :
             La fonction ne retourne rien --> None
         """
-        for portal in self.get_map().portals:
-            if portal.from_world == self.current_map:
-                point = self.get_object(portal.origin_point)
-                rect = py.Rect(point.x, point.y, point.width, point.height)
-                
-                if self.player.feet.colliderect(rect):
-                    copy_portal = portal
-                    self.current_map = portal.target_world
-                    if self.current_map == "World_Alpha":
-                        self.load_path()
-                        self.teleport_npcs()
-                    self.change_map()
-                    self.teleport_player(copy_portal.teleport_point)
+        # rects des portails calculés au chargement de la map
+        for rect, portal in self.get_map().portal_triggers:
+            if self.player.feet.colliderect(rect):
+                self.current_map = portal.target_world
+                if self.current_map == "World_Alpha":
+                    self.load_path()
+                    self.teleport_npcs()
+                self.change_map()
+                self.teleport_player(portal.teleport_point)
+                # les portails suivants sont ceux de l'ancienne map
+                break
                     
                     
                     
+        wall_grid = self.get_map().wall_grid
+        talking_npcs = self.get_talking_npcs()
         for sprite in self.get_group().sprites():
             if type(sprite) is Basicnpc:
                 # if sprite.feet.colliderect(self.player.rect):
@@ -115,113 +222,12 @@ class MapManager:
                 # else:
                 #     sprite.speed = 4
                 #     sprite.moving = True
-                sprite.speed = sprite.moving = not sprite.feet.colliderect(self.player.rect)
+                sprite.speed = sprite.moving = sprite not in talking_npcs and sprite.has_path()
             if not isinstance(sprite, TiledEntity):
-                if sprite.feet.collidelist(self.get_walls()) > - 1:
+                # seules les cases de la grille sous les pieds sont testées, pas tous les murs
+                if wall_grid.collides(sprite.feet):
                     sprite.move_back()
                     
-    def path_length(self, start_point, end_point):
-        """Calcule la longueur du chemin entre deux points
-
-        Args:
-            start_point (tuple): Coordonnées du point de départ
-            end_point (tuple): Coordonnées du point d'arrivée
-
-        Returns:
-            La fonction retourne la longueur du chemin entre deux points --> int
-        """
-        return len(self.check_shortest_path(self.map_collisions_list, start_point, end_point, 1, self.heuristic(self.map_collisions_list, end_point))[0])
-                    
-    def check_shortest_path(self, grid, init, goal, cost, heuristic):
-        """Retourne le chemin le plus court dans une grille 2d d'un point
-        init à un point goal
-
-        Args:
-            grid (list): grille
-            init (tuple): position de départ
-            goal (tuple): position d'arrivée
-            cost (int): fonction de coût
-            heuristic (list[list[int]]): liste d'estimation
-
-        Returns:
-            tuple[list[list[int]], list[list[int]]]: chemin le plus court
-        """
-        
-        DIRECTIONS = [
-            [-1, 0],  # left
-            [0, -1],  # down
-            [1, 0],  # right
-            [0, 1],  # up
-        ]
-        
-        closed = [
-            [0 for col in range(len(grid[0]))] for row in range(len(grid))
-        ]  # the reference grid
-        closed[init[0]][init[1]] = 1
-        action = [
-            [0 for col in range(len(grid[0]))] for row in range(len(grid))
-        ]  # the action grid
-
-        x = init[0]
-        y = init[1]
-        g = 0
-        f = g + heuristic[x][y]  # cost from starting cell to destination cell
-        cell = [[f, g, x, y]]
-
-        found = False  # flag that is set when search is complete
-        resign = False  # flag set if we can't find expand
-
-        while not found and not resign:
-            if len(cell) == 0:
-                raise ValueError("Algorithm is unable to find solution")
-            else:  # to choose the least costliest action so as to move closer to the goal
-                cell.sort()
-                cell.reverse()
-                next = cell.pop()
-                x = next[2]
-                y = next[3]
-                g = next[1]
-
-                if x == goal[0] and y == goal[1]:
-                    found = True
-                else:
-                    for i in range(len(DIRECTIONS)):  # to try out different valid actions
-                        x2 = x + DIRECTIONS[i][0]
-                        y2 = y + DIRECTIONS[i][1]
-                        if x2 >= 0 and x2 < len(grid) and y2 >= 0 and y2 < len(grid[0]):
-                            if closed[x2][y2] == 0 and grid[x2][y2] == 0:
-                                g2 = g + cost
-                                f2 = g2 + heuristic[x2][y2]
-                                cell.append([f2, g2, x2, y2])
-                                closed[x2][y2] = 1
-                                action[x2][y2] = i
-        invpath = []
-        x = goal[0]
-        y = goal[1]
-        invpath.append([x, y])  # we get the reverse path from here
-        while x != init[0] or y != init[1]:
-            x2 = x - DIRECTIONS[action[x][y]][0]
-            y2 = y - DIRECTIONS[action[x][y]][1]
-            x = x2
-            y = y2
-            invpath.append([x, y])
-
-        path = []
-        for i in range(len(invpath)):
-            path.append(invpath[len(invpath) - 1 - i])
-        return path, action
-    
-    def heuristic(self, grid, goal):
-        heuristic = [[0 for row in range(len(grid[0]))] for col in range(len(grid))]
-        for i in range(len(grid)):
-            for j in range(len(grid[0])):
-                heuristic[i][j] = abs(i - goal[0]) + abs(j - goal[1])
-                if grid[i][j] == 1:
-                    # added extra penalty in the heuristic map
-                    heuristic[i][j] = 99
-        return heuristic
-        
-        
     def teleport_player(self, name : str) -> None:
         """Teleporte le joueur
 
@@ -236,42 +242,49 @@ class MapManager:
         self.player.position[1] = point.y
         self.player.save_location()  
         
-    def register_map(self, name : str, portals=[] , npcs=[], shops=[]) -> None:
-        """Boucle principale générant les principales intervenants de la map
+    def register_map(self, name : str, portals=[] , npcs=[], shops=[], sprites=[]) -> None:
+        """Déclare une map, elle ne sera chargée que quand le joueur y entrera
 
         Args:
             name (str): nom de la map
             portals (list, optional): portails présents sur la map. Defaults to [].
             npcs (list, optional): npcs présents sur la map. Defaults to [].
             shops (list, optional): shops présents sur la map. Defaults to [].
+            sprites (list, optional): autres entités présentes sur la map. Defaults to [].
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        self.map_descriptors[name] = MapDescriptor(name, portals, npcs, shops, list(sprites))
+
+    def load_map(self, name : str) -> None:
+        """Boucle principale générant les principales intervenants de la map
+
+        Args:
+            name (str): nom de la map
 
         Returns :
             La fonction ne retourne rien --> None
         """
-        # charger la carte (tmx)
-        tmx_data = pytmx.util_pygame.load_pygame(f'Maps/{name}.tmx')
+        descriptor = self.map_descriptors[name]
+        # charger la carte (tmx), déjà lue en arrière-plan si c'est une map voisine
+        prepared = self.prefetcher.take(name)
+        if prepared is not None:
+            tmx_data = prepared.tmx_data
+        else:
+            # les tuiles des tilesets communs à plusieurs maps ne sont découpées qu'une fois
+            tmx_data = pytmx.TiledMap(f'Maps/{name}.tmx', image_loader=TilesetRegistry.image_loader)
         map_data = pyscroll.data.TiledMapData(tmx_data)
         self.map_layer = pyscroll.orthographic.BufferedRenderer(map_data, self.screen.get_size())
         self.map_layer.zoom = self.change_zoom(self.screen.get_width(), self.screen.get_height())
         
         
-        # definir une liste qui va stocker les rectangles de collisions
-        walls = []
+        # les murs, la grille de collisions (propre à la map), les objets et les checkpoints
+        # viennent du cache de la map (recompilé seulement si le tmx a changé)
+        artifacts = prepared.artifacts if prepared is not None else MapCache.get_artifacts(name, tmx_data)
+        wall_grid = WallGrid(artifacts.walls, tmx_data.width, tmx_data.height, tmx_data.tilewidth, tmx_data.tileheight)
         AnimatedTile = []
         
-        
-        for layer in tmx_data.visible_layers:
-            if isinstance(layer, pytmx.pytmx.TiledTileLayer):
-                for tile in layer.tiles():
-                    if 'collisions' in layer.name:
-                        walls.append(py.Rect(tile[0] * tile[2].get_width(), tile[1] * tile[2].get_height(), tile[2].get_width(), tile[2].get_height()))
-                        try:
-                            self.map_collisions_list[tile[1]][tile[0]] = self.map_collisions_list[tile[1]][tile[0] + 1] = self.map_collisions_list[tile[1]][tile[0] - 1] = self.map_collisions_list[tile[1] + 1][tile[0]] = self.map_collisions_list[tile[1] - 1][tile[0]] = 1
-                        except IndexError:
-                            self.map_collisions_list[tile[1]][tile[0]] = 1
-                    if layer.name == "roads":
-                        self.map_collisions_list[tile[1]][tile[0]] = 1
-        
         # for obj in tmx_data.objects:
         #     if obj.type == "test":
         #         AnimatedTile.append(TiledEntity(obj.x, obj.y, obj.name, obj.width, obj.height, 4, 5))
@@ -279,21 +292,78 @@ class MapManager:
 
         # dessiner le groupe de calque
         group = pyscroll.PyscrollGroup(map_layer=self.map_layer, default_layer=12)
-        if name == 'library':
-            self.voleur_library = Voleur(478, 233, "Bruce")
-            group.add(self.voleur_library)
-        elif name == 'World_Alpha':
-            self.voleur_world = Voleur(2464, 2940, "Bruce")
-            group.add(self.voleur_world)
+        for sprite in descriptor.sprites:
+            group.add(sprite)
         group.add(self.player)
 
         
         
-        for npc in npcs:
+        for npc in descriptor.npcs:
             group.add(npc)
+
+        spatial_hash = SpatialHash()
+        for sprite in group.sprites():
+            spatial_hash.insert(sprite)
         
         # creer un objet map
-        self.maps[name] = Map(name, walls, group, tmx_data, portals, npcs, shops)
+        objects = {object_name : MapObject(*rect) for object_name, rect in artifacts.objects.items()}
+        portal_triggers = [
+            (py.Rect(artifacts.objects[portal.origin_point]), portal)
+            for portal in descriptor.portals if portal.from_world == name
+        ]
+        checkpoints = [Checkpoint(*checkpoint) for checkpoint in artifacts.checkpoints]
+        path_finder = PathFinder(artifacts.collision_grid)
+        self.maps[name] = Map(name, group, tmx_data, descriptor.portals, descriptor.npcs, descriptor.shops, objects, portal_triggers, checkpoints, CheckpointIndex(checkpoints), artifacts.collision_grid, path_finder, RouteCache.fingerprint(artifacts.collision_grid), FlowFields(path_finder), wall_grid, spatial_hash)
+
+    def unload_map(self, name : str) -> None:
+        """Décharge une map (tmx, rendu, murs), elle sera rechargée à la prochaine visite
+
+        Args:
+            name (str): nom de la map
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        map_data = self.maps.pop(name)
+        descriptor = self.map_descriptors[name]
+        # les entités tuées pendant la visite (le voleur par exemple) ne reviennent pas
+        descriptor.sprites = [sprite for sprite in descriptor.sprites if map_data.group.has(sprite)]
+        # les entités gardées (joueur, PNJ) ne mettent plus à jour le SpatialHash de la map
+        map_data.spatial_hash.clear()
+        self.maps_last_visit.remove(name)
+
+    def visit_map(self, name : str) -> None:
+        """Charge la map si besoin et décharge les maps les moins récemment visitées
+
+        Args:
+            name (str): nom de la map
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        if name in self.maps_last_visit:
+            self.maps_last_visit.remove(name)
+        self.maps_last_visit.append(name)
+        if name not in self.maps:
+            self.load_map(name)
+        while len(self.maps) > self.MAX_LOADED_MAPS:
+            self.unload_map(self.maps_last_visit[0])
+        self.prefetch_neighbours(name)
+
+    def prefetch_neighbours(self, name : str) -> None:
+        """Prépare en arrière-plan les maps où mènent les portails de la map et qui ne sont pas chargées
+
+        Args:
+            name (str): nom de la map
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        neighbours = [portal.target_world for portal in self.map_descriptors[name].portals
+                      if portal.target_world in self.map_descriptors and portal.target_world not in self.maps]
+        self.prefetcher.keep_only(neighbours)
+        for neighbour in neighbours:
+            self.prefetcher.prefetch(neighbour)
         
     def change_zoom(self, width: int, height: int) -> dict:
         """Change le zomm en fonction du pleine écran ou non
@@ -317,6 +387,8 @@ class MapManager:
         Returns:
             dict: map actuel
         """
+        if self.current_map not in self.maps or self.maps_last_visit[-1] != self.current_map:
+            self.visit_map(self.current_map)
         return self.maps[self.current_map]
     
     def get_group(self) -> dict:
@@ -330,27 +402,30 @@ class MapManager:
         """
         return self.get_map().group
     
-    def get_walls(self) -> dict:
-        """Retourne groupe de murs
+    def get_hierarchical_path_finder(self) -> HierarchicalPathFinder:
+        """Retourne la recherche hiérarchique de la map actuelle, pour les longs trajets
 
         Args:
             La fonction ne prends aucun argument --> None
 
         Returns:
-            dict: groupe de murs
+            HierarchicalPathFinder: recherche hiérarchique, son graphe est lu dans Maps/cache s'il est à jour
         """
-        return self.get_map().walls
-    
-    def get_object(self, name: str) -> dict:
-        """Recoit les objets par nom depuis le fichier tmx
+        map_data = self.get_map()
+        if map_data.hierarchical_path_finder is None:
+            map_data.hierarchical_path_finder = HierarchicalPathFinder.load(map_data.name, map_data.path_finder, map_data.grid_fingerprint)
+        return map_data.hierarchical_path_finder
+
+    def get_object(self, name: str) -> MapObject:
+        """Recoit les objets par nom depuis le fichier tmx (dictionnaire fait au chargement de la map)
 
         Args:
             name (str): nom des objets
 
         Returns:
-            dict: objets et leurs noms
+            MapObject: position et taille de l'objet
         """
-        return self.get_map().tmx_data.get_object_by_name(name)
+        return self.get_map().objects[name]
     
     def teleport_npcs(self) -> None:
         """Teleporte les PNJ
@@ -366,8 +441,10 @@ class MapManager:
             npcs = map_data.npcs
             
             for index, npc in enumerate(npcs):
-                npc.load_points(self.path_list[index])
-                npc.teleport_spawn()
+                # les trajets encore en recherche seront donnés par set_npc_path
+                if self.path_list[index] is not None:
+                    npc.load_points(self.path_list[index])
+                    npc.teleport_spawn()
     
     def draw(self) -> None:
         """Dessine la map
@@ -390,11 +467,8 @@ class MapManager:
         Returns :
             La fonction ne retourne rien --> None
         """
-        world = JM.open_file("saves")
-        
-        world["player"]["current_world"] = self.current_map
-        
-        JM.write_file("saves", world)
+        JM.set(("player", "current_world"), self.current_map)
+        JM.save("saves")
         
     def update(self) -> None:
         """Met a jour la map avec les npc
@@ -407,6 +481,10 @@ class MapManager:
         """
         self.get_group().update()
         self.check_collisions()
+        self.prefetcher.update()
+        self.path_scheduler.update()
         
         for npc in self.get_map().npcs:
-            npc.move()
\ No newline at end of file
+            # un PNJ sans trajet reste sur son point de départ
+            if npc.has_path():
+                npc.move()
\ No newline at end of file
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+import pytmx
+
+
+@dataclass
+class MapArtifacts:
+    walls : list
+    collision_grid : np.ndarray
+    objects : dict
+    checkpoints : list
+
+
+class MapCache:
+    """Compile les données dérivées d'une map (murs, grille de collisions, objets, checkpoints)
+    et les garde dans un fichier binaire dans Maps/cache/.
+
+    Le fichier est identifié par le hash du tmx et des tilesets qu'il utilise : quand la map
+    est modifiée dans Tiled le cache ne correspond plus et il est recompilé au prochain chargement.
+    """
+    MAPS_DIRECTORY = 'Maps'
+    CACHE_DIRECTORY = os.path.join(MAPS_DIRECTORY, 'cache')
+    MAGIC = b"MLMC"
+    # à changer quand la façon de compiler change, les anciens caches seront recompilés
+    VERSION = 3
+    HEADER = struct.Struct("<4sH32s")
+    SECTION = struct.Struct("<I")
+
+    @staticmethod
+    def tmx_path(name : str) -> str:
+        return os.path.join(MapCache.MAPS_DIRECTORY, f'{name}.tmx')
+
+    @staticmethod
+    def cache_path(name : str) -> str:
+        return os.path.join(MapCache.CACHE_DIRECTORY, f'{name}.mapcache')
+
+    @staticmethod
+    def get_map_names() -> list:
+        """Retourne le nom de toutes les maps du dossier Maps/"""
+        return sorted(filename[:-4] for filename in os.listdir(MapCache.MAPS_DIRECTORY) if filename.endswith('.tmx'))
+
+    @staticmethod
+    def compute_key(name : str) -> bytes:
+        """Hash du tmx, des tilesets externes qu'il utilise et de la version du compilateur
+
+        Args:
+            name (str): nom de la map
+
+        Returns:
+            bytes: hash sha256
+        """
+        key = hashlib.sha256(f'{MapCache.VERSION}'.encode())
+        with open(MapCache.tmx_path(name), 'rb') as f:
+            content = f.read()
+        key.update(content)
+        for source in re.findall(rb'<tileset[^>]*source="([^"]+)"', content):
+            tileset_path = os.path.join(MapCache.MAPS_DIRECTORY, source.decode('utf-8'))
+            if os.path.exists(tileset_path):
+                with open(tileset_path, 'rb') as f:
+                    key.update(f.read())
+        return key.digest()
+
+    @staticmethod
+    def get_artifacts(name : str, tmx_data=None) -> MapArtifacts:
+        """Retourne les données dérivées de la map, depuis le cache s'il est à jour
+
+        Args:
+            name (str): nom de la map
+            tmx_data (pytmx.TiledMap, optional): map déjà chargée, évite de relire le tmx si le cache est périmé. Defaults to None.
+
+        Returns:
+            MapArtifacts: données dérivées de la map
+        """
+        key = MapCache.compute_key(name)
+        artifacts = MapCache.read(name, key)
+        if artifacts is None:
+            artifacts = MapCache.compile(name, tmx_data)
+            MapCache.write(name, key, artifacts)
+        return artifacts
+
+    @staticmethod
+    def compile(name : str, tmx_data=None) -> MapArtifacts:
+        """Calcule les données dérivées de la map à partir des tableaux de tuiles de ses calques
+
+        Args:
+            name (str): nom de la map
+            tmx_data (pytmx.TiledMap, optional): map déjà chargée, sinon le tmx est lu sans ses images. Defaults to None.
+
+        Returns:
+            MapArtifacts: données dérivées de la map
+        """
+        if tmx_data is None:
+            tmx_data = pytmx.TiledMap(MapCache.tmx_path(name))
+        walls_mask = np.zeros((tmx_data.height, tmx_data.width), dtype=bool)
+        roads_mask = np.zeros_like(walls_mask)
+        walls = []
+
+        for layer in tmx_data.visible_layers:
+            # seuls les calques de collisions et de routes sont convertis en tableaux
+            if isinstance(layer, pytmx.pytmx.TiledTileLayer) and ('collisions' in layer.name or layer.name == "roads"):
+                gids = np.asarray(layer.data, dtype=np.uint32)
+                if 'collisions' in layer.name:
+                    ys, xs = np.nonzero(gids)
+                    walls_mask[ys, xs] = True
+                    # taille de tuile du tileset de chaque gid utilisé par le calque
+                    used_gids, inverse = np.unique(gids[ys, xs], return_inverse=True)
+                    sizes = np.array([MapCache.get_tile_size(tmx_data, gid) for gid in used_gids.tolist()], dtype=np.int32).reshape(-1, 2)[inverse]
+                    walls.extend(map(tuple, np.column_stack((xs * sizes[:, 0], ys * sizes[:, 1], sizes)).tolist()))
+                if layer.name == "roads":
+                    roads_mask |= gids != 0
+
+        grid = MapCache.dilate(walls_mask) | roads_mask
+        objects = {}
+        checkpoints = []
+        for obj in tmx_data.objects:
+            if obj.name is None:
+                continue
+            rect = (obj.x, obj.y, obj.width, obj.height)
+            # comme tmx_data.get_object_by_name, le dernier objet d'un nom l'emporte
+            objects[obj.name] = rect
+            if "checkpoint" in obj.name:
+                checkpoints.append((*rect, obj.name))
+        return MapArtifacts(walls, grid.astype(np.uint8), objects, checkpoints)
+
+    @staticmethod
+    def get_tile_size(tmx_data : pytmx.TiledMap, gid : int) -> tuple:
+        tileset = tmx_data.get_tileset_from_gid(gid)
+        return tileset.tilewidth, tileset.tileheight
+
+    @staticmethod
+    def dilate(mask : np.ndarray) -> np.ndarray:
+        """Ajoute à chaque case occupée ses 4 voisines (sans déborder de l'autre côté de la grille)
+
+        Args:
+            mask (np.ndarray): cases occupées
+
+        Returns:
+            np.ndarray: cases occupées après dilatation
+        """
+        dilated = mask.copy()
+        dilated[1:, :] |= mask[:-1, :]
+        dilated[:-1, :] |= mask[1:, :]
+        dilated[:, 1:] |= mask[:, :-1]
+        dilated[:, :-1] |= mask[:, 1:]
+        return dilated
+
+    @staticmethod
+    def write(name : str, key : bytes, artifacts : MapArtifacts) -> None:
+        """Écrit le cache de la map (fichier temporaire puis renommage)"""
+        os.makedirs(MapCache.CACHE_DIRECTORY, exist_ok=True)
+        metadata = json.dumps({
+            "objects": artifacts.objects, "checkpoints": artifacts.checkpoints, "grid_shape": artifacts.collision_grid.shape
+        }, ensure_ascii=False).encode('utf-8')
+        walls = np.asarray(artifacts.walls, dtype='<i4').tobytes()
+        cells = np.ascontiguousarray(artifacts.collision_grid, dtype=np.uint8).tobytes()
+        path = MapCache.cache_path(name)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(MapCache.HEADER.pack(MapCache.MAGIC, MapCache.VERSION, key))
+            for section in (metadata, walls, cells):
+                f.write(MapCache.SECTION.pack(len(section)))
+                f.write(section)
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def read(name : str, key : bytes) -> MapArtifacts:
+        """Lit le cache de la map
+
+        Args:
+            name (str): nom de la map
+            key (bytes): hash attendu
+
+        Returns:
+            MapArtifacts: données dérivées, None si le cache n'existe pas ou n'est plus à jour
+        """
+        path = MapCache.cache_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            content = f.read()
+        try:
+            magic, version, cache_key = MapCache.HEADER.unpack_from(content, 0)
+            if magic != MapCache.MAGIC or version != MapCache.VERSION or cache_key != key:
+                return None
+            position = MapCache.HEADER.size
+            sections = []
+            for _ in range(3):
+                length, = MapCache.SECTION.unpack_from(content, position)
+                position += MapCache.SECTION.size
+                sections.append(content[position:position + length])
+                position += length
+        except struct.error:
+            # cache tronqué
+            return None
+        if position > len(content):
+            return None
+        metadata = json.loads(sections[0].decode('utf-8'))
+        walls = list(map(tuple, np.frombuffer(sections[1], dtype='<i4').reshape(-1, 4).tolist()))
+        grid = np.frombuffer(sections[2], dtype=np.uint8).reshape(metadata["grid_shape"]).copy()
+        objects = {name : tuple(rect) for name, rect in metadata["objects"].items()}
+        return MapArtifacts(walls, grid, objects, [tuple(checkpoint) for checkpoint in metadata["checkpoints"]])
+
@@ -0,0 +1,296 @@
+import heapq
+import time
+
+import numpy as np
+
+
+class PathFinder:
+    """Recherche de chemin (A*) sur la grille de collisions d'une map.
+
+    Les cases sont des entiers (ligne + 1) * largeur + colonne + 1 dans une grille entourée
+    d'une bordure de murs, il n'y a donc pas de test de bord. La liste ouverte est un tas
+    binaire et les tableaux (cases vues, direction d'arrivée) sont gardés d'une recherche
+    à l'autre : une recherche ne fait que changer de numéro au lieu de tout remettre à zéro.
+
+    Les chemins sont les mêmes que ceux de l'ancien MapManager.check_shortest_path : la case
+    ouverte choisie est la plus petite selon (f, g, ligne, colonne) et une case garde la
+    direction par laquelle elle a été vue en premier.
+    """
+    # estimation donnée aux cases bloquées (seule la case de départ peut en être une)
+    WALL_PENALTY = 99
+    # (ligne, colonne), même ordre que l'ancienne recherche
+    DIRECTIONS = [
+        [-1, 0],
+        [0, -1],
+        [1, 0],
+        [0, 1],
+    ]
+
+    def __init__(self, grid):
+        """
+        Args:
+            grid (np.ndarray | list[list[int]]): 1 si la case est bloquée, indexée [ligne][colonne]
+        """
+        grid = np.asarray(grid, dtype=np.uint8) != 0
+        self.height, self.width = grid.shape
+        self.stride = self.width + 2
+        self.blocked = bytearray(np.pad(grid, 1, constant_values=True).astype(np.uint8).tobytes())
+        self.offsets = [row * self.stride + column for row, column in self.DIRECTIONS]
+        self.seen = [0] * len(self.blocked)
+        self.search_id = 0
+        self.action = bytearray(len(self.blocked))
+
+    def encode(self, row : int, column : int) -> int:
+        return (row + 1) * self.stride + column + 1
+
+    def decode(self, cell : int) -> list:
+        row, column = divmod(cell, self.stride)
+        return [row - 1, column - 1]
+
+    def is_blocked(self, row : int, column : int) -> bool:
+        return bool(self.blocked[self.encode(row, column)])
+
+    def estimate(self, row : int, column : int, goal) -> int:
+        """Distance de Manhattan jusqu'à goal, WALL_PENALTY pour une case bloquée"""
+        if self.is_blocked(row, column):
+            return self.WALL_PENALTY
+        return abs(row - goal[0]) + abs(column - goal[1])
+
+    def find_path(self, init, goal, cost : int = 1, heuristic=None) -> list:
+        """Retourne le chemin le plus court de init à goal
+
+        Args:
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+            cost (int, optional): coût d'un déplacement. Defaults to 1.
+            heuristic (list[list[int]], optional): estimation de la distance restante, indexée [ligne][colonne].
+                Si None elle est calculée case par case quand la case est vue (voir estimate). Defaults to None.
+
+        Raises:
+            ValueError: aucun chemin n'existe
+
+        Returns:
+            list[list[int]]: cases du chemin, de init à goal
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        seen = self.seen
+        blocked = self.blocked
+        action = self.action
+        offsets = list(enumerate(self.offsets))
+        stride = self.stride
+
+        start = self.encode(init[0], init[1])
+        end = self.encode(goal[0], goal[1])
+        seen[start] = search_id
+        goal_row, goal_column = goal[0] + 1, goal[1] + 1
+        start_estimate = self.estimate(init[0], init[1], goal) if heuristic is None else heuristic[init[0]][init[1]]
+        # (f, g, case) : la case encodée garde l'ordre (ligne, colonne)
+        open_list = [(start_estimate, 0, start)]
+        push, pop = heapq.heappush, heapq.heappop
+
+        while True:
+            if not open_list:
+                raise ValueError("Algorithm is unable to find solution")
+            _, g, cell = pop(open_list)
+            if cell == end:
+                break
+            g2 = g + cost
+            for direction, offset in offsets:
+                neighbour = cell + offset
+                if seen[neighbour] != search_id and not blocked[neighbour]:
+                    seen[neighbour] = search_id
+                    action[neighbour] = direction
+                    row, column = divmod(neighbour, stride)
+                    if heuristic is None:
+                        # une case bloquée n'est jamais ajoutée, son estimation serait WALL_PENALTY
+                        estimate = abs(row - goal_row) + abs(column - goal_column)
+                    else:
+                        estimate = heuristic[row - 1][column - 1]
+                    push(open_list, (g2 + estimate, g2, neighbour))
+
+        path = [end]
+        cell = end
+        while cell != start:
+            cell -= self.offsets[action[cell]]
+            path.append(cell)
+        path.reverse()
+        return [self.decode(cell) for cell in path]
+
+
+class PathSearch:
+    """Recherche A* de PathFinder qui peut être avancée petit à petit (quelques cases par frame).
+
+    Elle donne le même chemin que PathFinder.find_path avec l'heuristique calculée à la volée,
+    mais garde son propre état (cases vues dans un dictionnaire) pour que plusieurs recherches
+    puissent être en cours en même temps sur la même map.
+
+    Avec une recherche hiérarchique (HierarchicalPathFinder), le premier pas essaie d'abord le chemin
+    hiérarchique (quelques millisecondes pour un long trajet). La recherche complète n'est avancée
+    que s'il est plus de MAX_RATIO fois trop long.
+    """
+    # nombre de cases développées entre deux lectures de l'heure
+    CLOCK_INTERVAL = 32
+
+    def __init__(self, path_finder : PathFinder, init, goal, cost : int = 1, hierarchical_path_finder=None):
+        """
+        Args:
+            path_finder (PathFinder): grille de la map
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+            cost (int, optional): coût d'un déplacement. Defaults to 1.
+            hierarchical_path_finder (HierarchicalPathFinder, optional): recherche hiérarchique de la même grille,
+                essayée avant la recherche complète. Defaults to None.
+        """
+        self.path_finder = path_finder
+        self.hierarchical_path_finder = hierarchical_path_finder
+        self.init = init
+        self.goal = goal
+        self.cost = cost
+        self.start = path_finder.encode(init[0], init[1])
+        self.end = path_finder.encode(goal[0], goal[1])
+        # case vue --> direction par laquelle elle a été vue en premier
+        self.came_from = {self.start : None}
+        self.open_list = [(path_finder.estimate(init[0], init[1], goal), 0, self.start)]
+        self.expansions = 0
+        self.path = None
+        self.error = None
+        self.callbacks = []
+
+    @property
+    def done(self) -> bool:
+        return self.path is not None or self.error is not None
+
+    def step(self, max_expansions : int = None, deadline : float = None) -> bool:
+        """Avance la recherche
+
+        Args:
+            max_expansions (int, optional): nombre de cases à développer au plus. Defaults to None.
+            deadline (float, optional): heure (time.perf_counter) à laquelle s'arrêter. Defaults to None.
+
+        Returns:
+            bool: True si la recherche est finie (chemin trouvé dans path, ou ValueError dans error)
+        """
+        if self.done:
+            return True
+        if self.hierarchical_path_finder is not None:
+            hierarchical_path_finder, self.hierarchical_path_finder = self.hierarchical_path_finder, None
+            try:
+                self.path = hierarchical_path_finder.try_find_path(self.init, self.goal)
+            except ValueError as error:
+                self.error = error
+            if self.done:
+                self.came_from = None
+                self.open_list = None
+                return True
+        path_finder = self.path_finder
+        blocked = path_finder.blocked
+        offsets = list(enumerate(path_finder.offsets))
+        stride = path_finder.stride
+        came_from = self.came_from
+        open_list = self.open_list
+        cost = self.cost
+        goal_row, goal_column = self.goal[0] + 1, self.goal[1] + 1
+        push, pop = heapq.heappush, heapq.heappop
+        expansions = 0
+
+        while max_expansions is None or expansions < max_expansions:
+            if deadline is not None and expansions % self.CLOCK_INTERVAL == 0 and expansions and time.perf_counter() >= deadline:
+                break
+            if not open_list:
+                self.error = ValueError("Algorithm is unable to find solution")
+                break
+            _, g, cell = pop(open_list)
+            expansions += 1
+            if cell == self.end:
+                self.path = self.get_path()
+                break
+            g2 = g + cost
+            for direction, offset in offsets:
+                neighbour = cell + offset
+                if neighbour not in came_from and not blocked[neighbour]:
+                    came_from[neighbour] = direction
+                    row, column = divmod(neighbour, stride)
+                    push(open_list, (g2 + abs(row - goal_row) + abs(column - goal_column), g2, neighbour))
+        self.expansions += expansions
+        return self.done
+
+    def get_path(self) -> list:
+        offsets = self.path_finder.offsets
+        path = [self.end]
+        cell = self.end
+        while cell != self.start:
+            cell -= offsets[self.came_from[cell]]
+            path.append(cell)
+        path.reverse()
+        # l'état de la recherche n'est plus utile
+        self.came_from = None
+        self.open_list = None
+        return [self.path_finder.decode(cell) for cell in path]
+
+
+class PathScheduler:
+    """File des recherches de chemin avancées à chaque frame pendant un temps limité,
+    pour que le calcul des trajets ne bloque pas le jeu.
+
+    Une recherche déjà demandée (même grille, départ et arrivée) n'est pas lancée deux fois,
+    la nouvelle fonction est ajoutée à celles appelées avec le chemin quand il est trouvé.
+    Les fonctions sont aussi appelées quand la recherche n'a pas de solution, avec l'erreur.
+    """
+    # temps donné aux recherches à chaque frame, en secondes
+    FRAME_BUDGET = 0.002
+
+    def __init__(self):
+        self.searches = dict()
+
+    def request(self, path_finder : PathFinder, init, goal, callback, hierarchical_path_finder=None) -> PathSearch:
+        """Demande un chemin, callback(path, error) sera appelé par update quand la recherche sera finie
+
+        Args:
+            path_finder (PathFinder): grille de la map
+            init (tuple): position de départ (ligne, colonne)
+            goal (tuple): position d'arrivée (ligne, colonne)
+            callback (function): fonction appelée avec le chemin (list[list[int]]) et None,
+                ou avec None et l'erreur (ValueError) s'il n'y a pas de chemin
+            hierarchical_path_finder (HierarchicalPathFinder, optional): recherche hiérarchique essayée
+                d'abord, pour les longs trajets (voir PathSearch). Defaults to None.
+
+        Returns:
+            PathSearch: recherche en cours
+        """
+        key = (path_finder, tuple(init), tuple(goal))
+        search = self.searches.get(key)
+        if search is None:
+            search = PathSearch(path_finder, init, goal, hierarchical_path_finder=hierarchical_path_finder)
+            self.searches[key] = search
+        search.callbacks.append(callback)
+        return search
+
+    def is_busy(self) -> bool:
+        return bool(self.searches)
+
+    def update(self, budget : float = FRAME_BUDGET, max_expansions : int = None) -> None:
+        """Avance les recherches dans l'ordre des demandes
+
+        Args:
+            budget (float, optional): temps disponible en secondes. Defaults to FRAME_BUDGET.
+            max_expansions (int, optional): nombre de cases à développer au plus sur toutes les recherches. Defaults to None.
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        deadline = time.perf_counter() + budget
+        remaining = max_expansions
+        for key, search in list(self.searches.items()):
+            expansions = search.expansions
+            if not search.step(remaining, deadline):
+                break
+            del self.searches[key]
+            for callback in search.callbacks:
+                callback(search.path, search.error)
+            if remaining is not None:
+                remaining -= search.expansions - expansions
+                if remaining <= 0:
+                    break
+            if time.perf_counter() >= deadline:
+                break
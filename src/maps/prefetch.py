@@ -0,0 +1,172 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import pytmx
+
+from maps.map_cache import MapArtifacts, MapCache
+from maps.tileset_registry import TilesetRegistry
+
+
+@dataclass(frozen=True)
+class TileRequest:
+    """Tuile que pytmx.TiledMap.reload_images a demandée, gardée à sa place dans tmx_data.images
+    jusqu'à ce qu'elle soit chargée dans le thread principal"""
+    filename : str
+    colorkey : str
+    rect : tuple
+    flags : object
+
+    def load(self):
+        return TilesetRegistry.image_loader(self.filename, self.colorkey)(self.rect, self.flags)
+
+
+@dataclass
+class PreparedMap:
+    name : str
+    tmx_data : pytmx.TiledMap
+    artifacts : MapArtifacts
+
+
+class PrefetchJob:
+    """Préparation d'une map : lecture du tmx dans un thread, puis chargement des images par morceaux"""
+
+    def __init__(self, name : str):
+        self.name = name
+        self.tmx_data = None
+        self.artifacts = None
+        self.error = None
+        self.sources = dict()
+        self.images = None
+        self.images_loaded = False
+        self.parsed = threading.Event()
+        self.thread = threading.Thread(target=self.parse, name=f"map-prefetch-{name}", daemon=True)
+        self.thread.start()
+
+    def parse(self) -> None:
+        """Lit le tmx sans ses images, calcule les données dérivées et décode les images
+        des tilesets utilisés par la map (dans le thread)"""
+        try:
+            self.tmx_data = pytmx.TiledMap(MapCache.tmx_path(self.name))
+            self.artifacts = MapCache.get_artifacts(self.name, self.tmx_data)
+            # tmx_data.images reçoit les tuiles à charger, aucune surface n'est créée dans le thread
+            self.tmx_data.image_loader = PrefetchJob.request_loader
+            self.tmx_data.reload_images()
+            self.tmx_data.image_loader = TilesetRegistry.image_loader
+            # seules les images dont la map utilise des tuiles sont décodées (comme avec le chargement
+            # direct, un tileset que la map n'utilise pas peut manquer)
+            for image in self.tmx_data.images:
+                if isinstance(image, TileRequest) and image.filename not in self.sources:
+                    # le décodage du png ne touche pas à l'écran, seul convert doit attendre le thread principal.
+                    # garder l'image ici la garde aussi dans le registre jusqu'au découpage des tuiles
+                    self.sources[image.filename] = TilesetRegistry.get_tileset(image.filename).get_source()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.parsed.set()
+
+    @staticmethod
+    def request_loader(filename : str, colorkey, **kwargs):
+        """Fonction de chargement pour pytmx qui rend une TileRequest au lieu de la tuile"""
+        def request_tile(rect=None, flags=None):
+            return TileRequest(filename, colorkey, rect, flags)
+        return request_tile
+
+    def load_images(self, deadline : float = None) -> bool:
+        """Charge les images de la map jusqu'à la fin du temps donné (dans le thread principal)
+
+        Args:
+            deadline (float, optional): heure (time.perf_counter) à laquelle s'arrêter, tout est chargé si None. Defaults to None.
+
+        Returns:
+            bool: True si toutes les images sont chargées
+        """
+        if self.images is None:
+            self.images = MapPrefetcher.iter_images(self.tmx_data)
+        for _ in self.images:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+        self.images_loaded = True
+        return True
+
+
+class MapPrefetcher:
+    """Prépare à l'avance les maps voisines de la map actuelle (celles de ses portails).
+
+    Le tmx est lu et les murs et la grille de collisions sont calculés dans un thread. Les
+    surfaces pygame ne sont créées que dans le thread principal, quelques tuiles à chaque
+    frame, pour que le passage d'un portail ne fasse pas sauter d'images.
+    """
+    # temps maximum passé à charger des images à chaque frame, en secondes
+    FRAME_BUDGET = 0.003
+    TILES_PER_SLICE = 32
+
+    def __init__(self):
+        self.jobs = dict()
+
+    def prefetch(self, name : str) -> None:
+        """Lance la préparation d'une map si elle n'est pas déjà en cours
+
+        Args:
+            name (str): nom de la map
+        """
+        if name not in self.jobs:
+            self.jobs[name] = PrefetchJob(name)
+
+    def keep_only(self, names) -> None:
+        """Oublie les maps préparées qui ne sont plus voisines de la map actuelle
+
+        Args:
+            names (iterable): noms des maps à garder
+        """
+        for name in [name for name in self.jobs if name not in names]:
+            del self.jobs[name]
+
+    def update(self, budget : float = FRAME_BUDGET) -> None:
+        """Charge une partie des images des maps préparées, appelé à chaque frame
+
+        Args:
+            budget (float, optional): temps disponible en secondes. Defaults to FRAME_BUDGET.
+        """
+        deadline = time.perf_counter() + budget
+        for job in self.jobs.values():
+            if job.images_loaded or not job.parsed.is_set() or job.error is not None:
+                continue
+            if not job.load_images(deadline):
+                return
+
+    def take(self, name : str) -> PreparedMap:
+        """Retourne la map préparée et termine ce qui reste à faire
+
+        Args:
+            name (str): nom de la map
+
+        Returns:
+            PreparedMap: la map préparée, None si elle n'a pas été demandée ou si sa lecture a échoué
+        """
+        job = self.jobs.pop(name, None)
+        if job is None:
+            return None
+        job.parsed.wait()
+        if job.error is not None:
+            return None
+        job.load_images()
+        job.sources.clear()
+        return PreparedMap(name, job.tmx_data, job.artifacts)
+
+    @staticmethod
+    def iter_images(tmx_data : pytmx.TiledMap):
+        """Remplace les TileRequest laissées par reload_images (voir PrefetchJob.parse) par les tuiles
+        du registre, en s'arrêtant tous les TILES_PER_SLICE tuiles
+
+        Args:
+            tmx_data (pytmx.TiledMap): map dont les images sont des TileRequest
+        """
+        images = tmx_data.images
+        count = 0
+        for index, image in enumerate(images):
+            if isinstance(image, TileRequest):
+                images[index] = image.load()
+                count += 1
+                if count % MapPrefetcher.TILES_PER_SLICE == 0:
+                    yield
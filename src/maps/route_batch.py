@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from maps.map_cache import MapCache
+from maps.pathfinding import PathFinder
+from maps.route_cache import RouteCache
+
+
+# grilles déjà ouvertes par un processus du pool, indexées par le nom de leur mémoire partagée
+_path_finders = dict()
+
+
+def _find_path(task : tuple):
+    """Recherche faite dans un processus du pool : la grille est lue dans la mémoire partagée
+    à la première recherche sur cette grille, puis gardée pour les suivantes"""
+    memory_name, shape, start, goal = task
+    path_finder = _path_finders.get(memory_name)
+    if path_finder is None:
+        memory = shared_memory.SharedMemory(name=memory_name)
+        try:
+            # PathFinder copie la grille dans ses propres tableaux
+            path_finder = PathFinder(np.ndarray(shape, dtype=np.uint8, buffer=memory.buf))
+        finally:
+            memory.close()
+        _path_finders[memory_name] = path_finder
+    try:
+        return path_finder.find_path(start, goal, 1)
+    except ValueError:
+        return None
+
+
+class RouteBatch:
+    """Calcule beaucoup de trajets à la fois sur tous les coeurs avec un pool de processus.
+
+    Chaque grille est copiée une seule fois dans une mémoire partagée, les processus n'en
+    reçoivent que le nom (pas de liste de listes à sérialiser pour chaque recherche).
+    """
+
+    @staticmethod
+    def find_paths(grids : dict, routes : dict, max_workers : int = None) -> dict:
+        """Cherche les trajets de plusieurs grilles
+
+        Args:
+            grids (dict): grille de collisions (np.ndarray, 1 si la case est bloquée) de chaque map
+            routes (dict): trajets [départ, arrivée] de chaque map
+            max_workers (int, optional): nombre de processus. Defaults to None (un par coeur).
+
+        Returns:
+            dict: chemins de chaque map dans l'ordre des trajets (None quand il n'y a pas de chemin)
+        """
+        memories = dict()
+        try:
+            tasks = []
+            for name, map_routes in routes.items():
+                grid = np.ascontiguousarray(grids[name], dtype=np.uint8)
+                memory = shared_memory.SharedMemory(create=True, size=max(grid.nbytes, 1))
+                memories[name] = memory
+                np.ndarray(grid.shape, dtype=np.uint8, buffer=memory.buf)[:] = grid
+                tasks.extend((memory.name, grid.shape, tuple(start), tuple(goal)) for start, goal in map_routes)
+
+            max_workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(tasks) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                paths = iter(list(executor.map(_find_path, tasks, chunksize=chunksize)))
+            return {name : [next(paths) for _ in map_routes] for name, map_routes in routes.items()}
+        finally:
+            for memory in memories.values():
+                memory.close()
+                memory.unlink()
+
+    @staticmethod
+    def precompute(routes : dict, max_workers : int = None) -> dict:
+        """Calcule les trajets qui ne sont pas encore dans le cache des trajets et les y ajoute
+
+        Args:
+            routes (dict): trajets [départ, arrivée] de chaque map
+            max_workers (int, optional): nombre de processus. Defaults to None (un par coeur).
+
+        Returns:
+            dict: nombre de trajets calculés (et sans chemin) de chaque map
+        """
+        grids = dict()
+        missing = dict()
+        for name, map_routes in routes.items():
+            grid = MapCache.get_artifacts(name).collision_grid
+            fingerprint = RouteCache.fingerprint(grid)
+            grids[name] = grid
+            missing[name] = [route for route in map_routes if RouteCache.get_path(name, fingerprint, *route) is None]
+
+        missing = {name : map_routes for name, map_routes in missing.items() if map_routes}
+        results = dict()
+        if missing:
+            for name, paths in RouteBatch.find_paths(grids, missing, max_workers).items():
+                fingerprint = RouteCache.fingerprint(grids[name])
+                for (start, goal), path in zip(missing[name], paths):
+                    if path is not None:
+                        RouteCache.add_path(name, fingerprint, start, goal, path)
+                results[name] = (len(paths), paths.count(None))
+            RouteCache.save()
+        return results
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from maps.map_cache import MapCache
+
+
+class RouteCache:
+    """Garde les chemins déjà calculés sur chaque map, en mémoire et dans Maps/cache/<map>.routes.
+
+    Un chemin est identifié par (map, départ, arrivée, empreinte de la grille de collisions) :
+    tant que la grille ne change pas il n'est calculé qu'une fois, même d'une partie à l'autre.
+    Quand la map est modifiée l'empreinte change et les anciens chemins sont oubliés.
+    """
+    # à changer quand la recherche de chemin change, les chemins seront recalculés
+    VERSION = 1
+    _routes = dict()
+    _modified = set()
+
+    @staticmethod
+    def cache_path(name : str) -> str:
+        return os.path.join(MapCache.CACHE_DIRECTORY, f'{name}.routes')
+
+    @staticmethod
+    def fingerprint(grid : np.ndarray) -> str:
+        """Hash de la grille de collisions (taille et cases) et de la version de la recherche
+
+        Args:
+            grid (np.ndarray): 1 si la case est bloquée, indexée [ligne, colonne]
+
+        Returns:
+            str: hash sha256 en hexadécimal
+        """
+        grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        key = hashlib.sha256(f'{RouteCache.VERSION}:{grid.shape}'.encode())
+        key.update(grid.tobytes())
+        return key.hexdigest()
+
+    @classmethod
+    def get_routes(cls, name : str, fingerprint : str) -> dict:
+        """Retourne les chemins connus de la map pour cette grille, lus sur le disque au premier appel
+
+        Args:
+            name (str): nom de la map
+            fingerprint (str): empreinte de la grille de collisions
+
+        Returns:
+            dict: chemins indexés par (départ, arrivée)
+        """
+        routes = cls._routes.get((name, fingerprint))
+        if routes is None:
+            routes = cls.read(name, fingerprint)
+            cls._routes[(name, fingerprint)] = routes
+        return routes
+
+    @classmethod
+    def get_path(cls, name : str, fingerprint : str, start, goal) -> list:
+        """Retourne le chemin de start à goal s'il est connu, sinon None (aucune recherche n'est faite)"""
+        return cls.get_routes(name, fingerprint).get((tuple(start), tuple(goal)))
+
+    @classmethod
+    def add_path(cls, name : str, fingerprint : str, start, goal, path : list) -> None:
+        """Garde un chemin calculé ailleurs (par une recherche faite en plusieurs frames par exemple)"""
+        cls.get_routes(name, fingerprint)[(tuple(start), tuple(goal))] = path
+        cls._modified.add((name, fingerprint))
+
+    @classmethod
+    def save(cls) -> None:
+        """Écrit sur le disque les chemins des maps qui en ont de nouveaux
+
+        Args:
+            La fonction ne prends aucun argument --> None
+
+        Returns :
+            La fonction ne retourne rien --> None
+        """
+        for name, fingerprint in sorted(cls._modified):
+            cls.write(name, fingerprint, cls._routes[(name, fingerprint)])
+        cls._modified.clear()
+
+    @staticmethod
+    def write(name : str, fingerprint : str, routes : dict) -> None:
+        """Écrit les chemins de la map (fichier temporaire puis renommage)"""
+        os.makedirs(MapCache.CACHE_DIRECTORY, exist_ok=True)
+        content = json.dumps({
+            "fingerprint": fingerprint,
+            "routes": [[list(start), list(goal), path] for (start, goal), path in routes.items()]
+        }, separators=(',', ':'))
+        path = RouteCache.cache_path(name)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def read(name : str, fingerprint : str) -> dict:
+        """Lit les chemins de la map
+
+        Args:
+            name (str): nom de la map
+            fingerprint (str): empreinte attendue
+
+        Returns:
+            dict: chemins indexés par (départ, arrivée), vide si le fichier n'existe pas ou n'est plus à jour
+        """
+        path = RouteCache.cache_path(name)
+        if not os.path.exists(path):
+            return dict()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            # fichier tronqué
+            return dict()
+        if content.get("fingerprint") != fingerprint:
+            return dict()
+        return {(tuple(start), tuple(goal)) : path for start, goal, path in content["routes"]}
@@ -0,0 +1,7 @@
+# trajets [départ, arrivée] des PNJ de chaque map (lignes, colonnes), un par PNJ dans l'ordre du groupe.
+# Ils sont dans un module à part pour que python -m maps les précalcule sans charger pygame et le jeu.
+ROUTES = {
+    "World_Alpha": [[[132, 22], [186, 123]], [[90, 144], [225, 88]], [[233, 168], [118, 30]],
+                    [[188, 132], [234, 13]], [[164, 229], [92, 19]], [[195, 95], [133, 237]],
+                    [[131, 22], [106, 113]], [[183, 148], [118, 98]], [[129, 144], [223, 153]]],
+}
@@ -0,0 +1,80 @@
+import pygame as py
+
+
+class SpatialHash:
+    """Répartit les entités d'une map dans des cases de CELL_SIZE pixels.
+
+    Une entité est rangée dans toutes les cases que son rect touche. Elle n'est déplacée
+    d'une case à l'autre que quand son rect en change (update), et une recherche ne regarde
+    que les cases autour du rect demandé au lieu de toutes les entités de la map.
+
+    Une entité qui a un attribut spatial_hashes (Entity) y retrouve les SpatialHash où elle est
+    rangée : elle les met à jour elle-même quand elle bouge (Entity.update_spatial_hashes).
+    """
+    CELL_SIZE = 64
+
+    def __init__(self, cell_size : int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = dict()
+        self.entity_cells = dict()
+
+    def get_cell_range(self, rect : py.Rect) -> tuple:
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def insert(self, entity) -> None:
+        """Ajoute une entité (elle doit avoir un rect)"""
+        cell_range = self.get_cell_range(entity.rect)
+        self.entity_cells[entity] = cell_range
+        if hasattr(entity, "spatial_hashes"):
+            entity.spatial_hashes.add(self)
+        left, top, right, bottom = cell_range
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                self.cells.setdefault((x, y), set()).add(entity)
+
+    def remove(self, entity) -> None:
+        """Retire une entité, rien ne se passe si elle n'y est pas"""
+        cell_range = self.entity_cells.pop(entity, None)
+        if cell_range is None:
+            return
+        if hasattr(entity, "spatial_hashes"):
+            entity.spatial_hashes.discard(self)
+        left, top, right, bottom = cell_range
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                cell = self.cells[(x, y)]
+                cell.discard(entity)
+                if not cell:
+                    del self.cells[(x, y)]
+
+    def clear(self) -> None:
+        """Retire toutes les entités (la map est déchargée)"""
+        for entity in list(self.entity_cells):
+            self.remove(entity)
+
+    def update(self, entity) -> None:
+        """Met à jour les cases d'une entité après un déplacement (rien à faire si elle reste dans les mêmes cases)"""
+        if self.entity_cells.get(entity) != self.get_cell_range(entity.rect):
+            self.remove(entity)
+            self.insert(entity)
+
+    def query(self, rect : py.Rect, entity_type=None) -> list:
+        """Retourne les entités dont le rect touche le rect donné
+
+        Args:
+            rect (py.Rect): zone recherchée (portée d'un dialogue, vision d'un ennemi...)
+            entity_type (type, optional): ne garder que les entités de ce type. Defaults to None.
+
+        Returns:
+            list: entités trouvées
+        """
+        left, top, right, bottom = self.get_cell_range(rect)
+        candidates = set()
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                cell = self.cells.get((x, y))
+                if cell:
+                    candidates |= cell
+        return [entity for entity in candidates
+                if (entity_type is None or isinstance(entity, entity_type)) and rect.colliderect(entity.rect)]
@@ -0,0 +1,119 @@
+import os
+import threading
+import weakref
+
+import pygame as py
+from pytmx.util_pygame import handle_transformation, smart_convert
+
+
+class SharedTileset:
+    """Image d'un tileset et tuiles déjà découpées, partagées par toutes les maps qui l'utilisent.
+
+    Les tuiles ne sont découpées que quand une map les demande, une tuile déjà découpée est
+    rendue telle quelle aux maps suivantes. L'image décodée et les tuiles ne sont gardées que
+    tant qu'une map (ou un chargement en cours) les utilise.
+    """
+
+    def __init__(self, path : str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.source = None
+        self.tiles = weakref.WeakValueDictionary()
+
+    def get_source(self) -> py.Surface:
+        """Retourne l'image du tileset, elle n'est décodée que si personne ne l'utilise déjà
+
+        Returns:
+            py.Surface: image du tileset
+        """
+        with self.lock:
+            image = self.source() if self.source is not None else None
+            if image is None:
+                image = py.image.load(self.path)
+                self.source = weakref.ref(image)
+            return image
+
+    def loader(self, colorkey=None, pixelalpha : bool = True):
+        """Fonction de chargement des tuiles pour pytmx
+
+        Args:
+            colorkey (str, optional): couleur transparente du tileset. Defaults to None.
+            pixelalpha (bool, optional): garder la transparence par pixel. Defaults to True.
+
+        Returns:
+            callable: fonction (rect, flags) -> tuile
+        """
+        color = py.Color(f"#{colorkey}") if colorkey else None
+        image = None
+
+        def load_tile(rect=None, flags=None):
+            nonlocal image
+            key = (rect, flags, colorkey, pixelalpha)
+            tile = self.tiles.get(key)
+            if tile is None:
+                # l'image n'est décodée que s'il manque une tuile
+                if image is None:
+                    image = self.get_source()
+                tile = image.subsurface(rect) if rect else image.copy()
+                if flags:
+                    tile = handle_transformation(tile, flags)
+                tile = smart_convert(tile, color, pixelalpha)
+                self.tiles[key] = tile
+            return tile
+
+        return load_tile
+
+    def get_size_in_bytes(self) -> int:
+        """Retourne la mémoire occupée par l'image décodée et les tuiles"""
+        surfaces = list(self.tiles.values())
+        image = self.source() if self.source is not None else None
+        if image is not None:
+            surfaces.append(image)
+        return sum(TilesetRegistry.get_surface_size(surface) for surface in surfaces)
+
+
+class TilesetRegistry:
+    """Registre des tilesets du jeu, un seul SharedTileset par image quelle que soit la map"""
+    _tilesets = dict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_tileset(cls, path : str) -> SharedTileset:
+        """Retourne le tileset d'une image, il est créé au premier appel
+
+        Args:
+            path (str): chemin de l'image
+
+        Returns:
+            SharedTileset: le tileset partagé
+        """
+        key = os.path.normcase(os.path.realpath(path))
+        with cls._lock:
+            tileset = cls._tilesets.get(key)
+            if tileset is None:
+                tileset = cls._tilesets[key] = SharedTileset(path)
+            return tileset
+
+    @staticmethod
+    def image_loader(filename : str, colorkey, **kwargs):
+        """Remplace pytmx.util_pygame.pygame_image_loader : pytmx.TiledMap(path, image_loader=TilesetRegistry.image_loader)
+
+        Args:
+            filename (str): chemin de l'image
+            colorkey (str): couleur transparente de l'image
+
+        Returns:
+            callable: fonction (rect, flags) -> tuile
+        """
+        return TilesetRegistry.get_tileset(filename).loader(colorkey, kwargs.get("pixelalpha", True))
+
+    @staticmethod
+    def get_surface_size(surface : py.Surface) -> int:
+        return surface.get_height() * surface.get_pitch()
+
+    @classmethod
+    def get_size_in_bytes(cls) -> int:
+        """Retourne la mémoire occupée par toutes les images et tuiles gardées"""
+        with cls._lock:
+            tilesets = list(cls._tilesets.values())
+        return sum(tileset.get_size_in_bytes() for tileset in tilesets)
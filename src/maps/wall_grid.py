@@ -0,0 +1,89 @@
+import numpy as np
+import pygame as py
+
+
+class WallGrid:
+    """Grille des murs d'une map, une case par tuile.
+
+    Une case vaut 1 quand un mur la recouvre entièrement. Les murs qui ne tombent pas
+    pile sur les tuiles (tileset d'une autre taille) sont gardés à part dans les cases
+    qu'ils touchent et testés avec colliderect, ceux qui dépassent de la map sont testés
+    à chaque fois. Un rect ne touche que quelques cases, le test ne dépend donc pas du
+    nombre de murs de la map.
+    """
+
+    def __init__(self, walls : list, width : int, height : int, tile_width : int, tile_height : int):
+        """
+        Args:
+            walls (list): murs de la map (x, y, largeur, hauteur) en pixels
+            width (int): largeur de la map en tuiles
+            height (int): hauteur de la map en tuiles
+            tile_width (int): largeur d'une tuile en pixels
+            tile_height (int): hauteur d'une tuile en pixels
+        """
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        grid = np.zeros((height, width), dtype=bool)
+        self.partial_walls = dict()
+        self.outside_walls = []
+
+        walls = np.asarray(walls, dtype=np.int64).reshape(-1, 4)
+        xs, ys, ws, hs = walls.T
+        inside = (xs >= 0) & (ys >= 0) & (xs + ws <= width * tile_width) & (ys + hs <= height * tile_height)
+        aligned = inside & (xs % tile_width == 0) & (ys % tile_height == 0) & (ws % tile_width == 0) & (hs % tile_height == 0)
+        # cas courant : un mur par tuile
+        single = aligned & (ws == tile_width) & (hs == tile_height)
+        grid[ys[single] // tile_height, xs[single] // tile_width] = True
+
+        for x, y, w, h in walls[aligned & ~single].tolist():
+            grid[y // tile_height:(y + h) // tile_height, x // tile_width:(x + w) // tile_width] = True
+        for wall in walls[inside & ~aligned].tolist():
+            rect = py.Rect(wall)
+            for cell in self.iter_cells(rect):
+                self.partial_walls.setdefault(cell, []).append(rect)
+        self.outside_walls = [py.Rect(wall) for wall in walls[~inside].tolist()]
+
+        # les cases sont lues une par une, plus rapide sur des listes python
+        self.cells = grid.tolist()
+
+    def iter_cells(self, rect : py.Rect):
+        """Parcours les cases (ligne, colonne) de la grille que le rect touche"""
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        left = max(rect.left // self.tile_width, 0)
+        right = min((rect.right - 1) // self.tile_width, self.width - 1)
+        top = max(rect.top // self.tile_height, 0)
+        bottom = min((rect.bottom - 1) // self.tile_height, self.height - 1)
+        for row in range(top, bottom + 1):
+            for column in range(left, right + 1):
+                yield row, column
+
+    def collides(self, rect : py.Rect) -> bool:
+        """Même résultat que rect.collidelist(murs) > -1
+
+        Args:
+            rect (py.Rect): rect à tester (les pieds d'une entité)
+
+        Returns:
+            bool: True si le rect touche un mur
+        """
+        if rect.width <= 0 or rect.height <= 0:
+            return False
+        # bornes des cases touchées, les indices négatifs ne doivent pas repartir de la fin des listes
+        left = max(rect.left // self.tile_width, 0)
+        right = max(min((rect.right - 1) // self.tile_width + 1, self.width), 0)
+        top = max(rect.top // self.tile_height, 0)
+        bottom = max(min((rect.bottom - 1) // self.tile_height + 1, self.height), 0)
+        for row in self.cells[top:bottom]:
+            if any(row[left:right]):
+                return True
+        if self.outside_walls and rect.collidelist(self.outside_walls) > -1:
+            return True
+        if self.partial_walls:
+            for cell in self.iter_cells(rect):
+                for wall in self.partial_walls.get(cell, ()):
+                    if rect.colliderect(wall):
+                        return True
+        return False
@@ -13,11 +13,9 @@ class QuestsSystem:
     def create_new_quests(self, description, position, xp, json_export=False):
         # Dans le cas où on veut stocker la quête dans le fichier json
         if json_export:
-            path = JM.get_specific_information('["player"]["database_data"]["quests"]')
+            path = JM.get(("player", "database_data", "quests"))
             if path == {} or not description in path:
-                quests = JM.open_file("saves")
-                quests["player"]["database_data"]["quests"][description] = {description:description, "position":position, "xp":xp}
-                JM.write_file("saves", quests)
+                JM.set(("player", "database_data", "quests", description), {description:description, "position":position, "xp":xp})
         # On regarde si la quête est déjà dans le json
         for quest in self.quests_dict:
             if description in quest or quest in description:
@@ -40,11 +38,9 @@ class QuestsSystem:
 
     def remove_quest(self, quest, json_export=False):
         if json_export:
-            data = JM.open_file("saves")
-            path = data["player"]["database_data"]["quests"]
+            path = JM.get(("player", "database_data", "quests"))
             if quest.description in path:
-                path.pop(quest.description)
-                JM.write_file("saves", data)
+                JM.delete(("player", "database_data", "quests", quest.description))
         if quest.description in self.quests_dict:
             del self.quests_dict[quest.description]
 
@@ -1,6 +1,7 @@
 import pygame as py
 import pytmx, pyscroll
 from .button import Button
+from maps.tileset_registry import TilesetRegistry
 
 
 
@@ -8,7 +9,7 @@ class Menu:
     def __init__(self, screen):
         self.boutons = []
         self.screen = screen
-        self.tmx_data = pytmx.util_pygame.load_pygame(f'Maps/game_menu.tmx')
+        self.tmx_data = pytmx.TiledMap(f'Maps/game_menu.tmx', image_loader=TilesetRegistry.image_loader)
     
     def creer(self, color, in_game=False):
         """Méthode qui créée le menu
@@ -8,7 +8,7 @@ class PlayerGui:
         self.fulllife_heart = self.load_image("fulllife_heart", 45, 45)
         self.nolife_heart = self.load_image("nolife_heart", 45, 45)
         self.keys_text_count = 0
-        self.keys_text_displayed = JM.get_specific_information('["player"]["keys_text_displayed"]')
+        self.keys_text_displayed = JM.get(("player", "keys_text_displayed"))
 
         self.keys_text_list = ["Utilisez les touches z, q, s, d pour vous déplacer",
                                "Appuyez sur la touche f pour afficher le menu des quêtes",
@@ -37,9 +37,7 @@ class PlayerGui:
         self.screen.blit(quest_menu, rect)
 
     def change_keys_text_status(self):
-        data = JM.open_file("saves")
-        data["player"]["keys_text_displayed"] = True
-        JM.write_file("saves", data)
+        JM.set(("player", "keys_text_displayed"), True)
 
 
     def keys_help_text(self):